@@ -22,8 +22,9 @@ from models import (
     update_user_language,
     update_user_location,
 )
-from services import handle_intents, translate_text
-from services.chat_logic import handle_intents_stream
+from services import get_readiness, handle_intents, start_background_warmup, translate_structured, translate_text
+from services.chat_logic import LOCALIZED_INTENTS, detect_intent, handle_intents_stream, reply_language
+from services.stream_translation import translate_stream
 
 
 load_dotenv()
@@ -31,6 +32,9 @@ load_dotenv()
 app = Flask(__name__)
 app.secret_key = "dev_secret_key_change_me"
 
+# Load the PDF index and Gemini model list in the background so the app serves traffic immediately
+start_background_warmup()
+
 LANGUAGE_CHOICES = [
     ("en", "English"),
     ("hi", "Hindi"),
@@ -128,6 +132,33 @@ def about():
     return render_template("about.html")
 
 
+@app.route("/ready")
+def readiness():
+    """Report the warm state of the heavy subsystems (PDF index, Gemini)."""
+    status = get_readiness()
+    return jsonify(status), 200 if status["ready"] else 503
+
+
+@app.route("/stats")
+@login_required
+def service_stats():
+    """Cache, model-health and hedging counters for tuning."""
+    from services.answer_cache import get_answer_cache_stats
+    from services.gemini import get_hedge_stats, get_model_stats
+    from services.market import get_market_snapshot_stats
+    from services.pdf_context import get_query_cache_stats
+    from services.translation import get_translation_cache_stats
+
+    return jsonify({
+        "query_embeddings": get_query_cache_stats(),
+        "answers": get_answer_cache_stats(),
+        "gemini_models": get_model_stats(),
+        "gemini_hedging": get_hedge_stats(),
+        "translations": get_translation_cache_stats(),
+        "market_snapshot": get_market_snapshot_stats(),
+    })
+
+
 @app.route("/market-prices")
 def market_prices():
     """Display live market prices from data.gov.in API"""
@@ -137,24 +168,18 @@ def market_prices():
 @app.route("/api/market/filters", methods=["GET"])
 def get_market_filters():
     """Get available filter options (states, districts, commodities) from market data"""
-    from services.market import fetch_market_data
+    from services.market import get_market_filter_options, get_market_snapshot_stats
     
     state = request.args.get("state")
     district = request.args.get("district")
     
-    # Fetch data with filters
-    data = fetch_market_data(state=state, district=district, limit=4000)
-    records = data.get("records", [])
-    
-    # Extract unique values
-    states = sorted(list(set(r.get("state", "") for r in records if r.get("state"))))
-    districts = sorted(list(set(r.get("district", "") for r in records if r.get("district"))))
-    commodities = sorted(list(set(r.get("commodity", "") for r in records if r.get("commodity"))))
+    # Served from the in-memory market snapshot
+    options = get_market_filter_options(state=state, district=district)
+    stats = get_market_snapshot_stats()
     
     return jsonify({
-        "states": states,
-        "districts": districts,
-        "commodities": commodities
+        **options,
+        "snapshot": {"stale": stats["stale"], "age_seconds": stats["age_seconds"], "refreshed_at": stats["refreshed_at"]},
     })
 
 
@@ -286,11 +311,17 @@ def get_response():
     # Call to AI service with English message
     bot_response = handle_intents(user, english_message)
     
-    # Translate response back to user's language
+    # Translate response back to user's language (templated replies are already in it)
     final_response = bot_response
-    if user_lang and user_lang != "en":
+    intent = detect_intent(english_message)
+    localized = intent in LOCALIZED_INTENTS and reply_language(user) == user_lang
+    if user_lang and user_lang != "en" and not localized:
         try:
-            final_response = translate_text(bot_response, src_language="en", dest_language=user_lang)
+            if intent == "market":
+                # Price listings: translate the distinct labels in one batch, keep numbers and ₹ as-is
+                final_response = translate_structured(bot_response, src_language="en", dest_language=user_lang)
+            else:
+                final_response = translate_text(bot_response, src_language="en", dest_language=user_lang)
         except Exception as e:
             print(f"Translation error (en->user): {e}")
             final_response = bot_response
@@ -378,16 +409,17 @@ def chat_stream():
             api_start = time.time()
             
             # Stream the response chunk by chunk (includes PDF context retrieval + Gemini API)
-            for chunk in handle_intents_stream(user, english_message):
-                # Translate each chunk to user's language before sending
-                translated_chunk = chunk
-                if user_lang and user_lang != "en":
-                    try:
-                        translated_chunk = translate_text(chunk, src_language="en", dest_language=user_lang)
-                    except Exception as e:
-                        print(f"Translation error for chunk: {e}")
-                        translated_chunk = chunk
-                
+            chunks = handle_intents_stream(user, english_message)
+            intent = detect_intent(english_message)
+            # Weather, market and profile replies come back rendered in the user's language
+            localized = intent in LOCALIZED_INTENTS and reply_language(user) == user_lang
+            if user_lang and user_lang != "en" and not localized and intent == "market":
+                # Each price block is translated as one batch of distinct labels
+                chunks = (translate_structured(chunk, src_language="en", dest_language=user_lang) for chunk in chunks)
+            elif user_lang and user_lang != "en" and not localized:
+                # Whole sentences are translated on worker threads while Gemini keeps streaming
+                chunks = translate_stream(chunks, src_language="en", dest_language=user_lang)
+            for translated_chunk in chunks:
                 full_response.append(translated_chunk)
                 # Send each chunk as Server-Sent Events (SSE) format immediately
                 chunk_data = f"data: {json.dumps({'text': translated_chunk})}\n\n"
@@ -1,8 +1,10 @@
 from .chat_logic import handle_intents
 from .gemini import generate_gemini_response  # re-export for potential direct use
+from .i18n import localize_name
 from .market import get_market_prices, search_commodity_prices, get_state_market_summary
-from .pdf_context import get_context_from_pdfs
-from .translation import translate_text
+from .pdf_context import get_context_from_pdfs, get_contexts_from_pdfs
+from .translation import translate_batch, translate_structured, translate_text
+from .warmup import get_readiness, start_background_warmup
 from .weather import get_weather
 
 __all__ = [
@@ -12,6 +14,12 @@ __all__ = [
     "search_commodity_prices",
     "get_state_market_summary",
     "get_context_from_pdfs",
+    "get_contexts_from_pdfs",
     "translate_text",
+    "translate_batch",
+    "translate_structured",
     "get_weather",
+    "localize_name",
+    "get_readiness",
+    "start_background_warmup",
 ]
@@ -0,0 +1,235 @@
+"""
+Inverted-file (IVF) approximate nearest-neighbour index over the chunk embeddings.
+
+Rows are clustered around ``nlist`` coarse centroids with spherical k-means; a
+query only scores the rows of the ``nprobe`` lists whose centroids are closest.
+Run ``python -m services.ann`` to measure recall against exact search for a
+range of probe counts and pick the latency/recall trade-off for a host.
+"""
+import argparse
+import json
+import os
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .embedding_store import save_array, save_json
+from .vector_search import exact_search, normalize_rows, top_k_indices
+
+IVF_META_FILE = "ivf.json"
+IVF_CENTROIDS_FILE = "ivf.centroids.npy"
+IVF_ROWS_FILE = "ivf.rows.npy"
+IVF_OFFSETS_FILE = "ivf.offsets.npy"
+
+_ASSIGN_BATCH = 65536
+
+
+def default_nlist(rows: int) -> int:
+    return max(int(np.sqrt(rows)), 1)
+
+
+def _assign(matrix: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    """Nearest centroid of every row, computed in batches to bound memory."""
+    assignments = np.empty(len(matrix), dtype=np.int32)
+    for start in range(0, len(matrix), _ASSIGN_BATCH):
+        block = np.asarray(matrix[start:start + _ASSIGN_BATCH], dtype=np.float32)
+        assignments[start:start + len(block)] = np.argmax(block @ centroids.T, axis=1)
+    return assignments
+
+
+class IVFIndex:
+    """Coarse centroids plus, per list, the matrix rows assigned to it."""
+
+    def __init__(self, centroids: np.ndarray, rows: np.ndarray, offsets: np.ndarray, meta: Optional[Dict[str, Any]] = None):
+        self.centroids = centroids
+        self.rows = rows
+        self.offsets = offsets
+        self.meta = meta or {}
+
+    @property
+    def nlist(self) -> int:
+        return len(self.centroids)
+
+    @classmethod
+    def train(cls, matrix: np.ndarray, nlist: Optional[int] = None, iterations: int = 10, sample_size: Optional[int] = None, seed: int = 0) -> "IVFIndex":
+        """
+        Cluster a unit-length embedding matrix with spherical k-means.
+
+        Args:
+            matrix: Unit-length float32 embedding matrix (rows x dim)
+            nlist: Number of inverted lists (defaults to sqrt(rows))
+            iterations: k-means iterations over the training sample
+            sample_size: Rows used to train the centroids (defaults to 64 per list)
+            seed: Random seed for sampling and initialization
+
+        Returns:
+            The trained index with every row assigned to a list
+        """
+        count = len(matrix)
+        nlist = min(nlist or default_nlist(count), count)
+        rng = np.random.default_rng(seed)
+
+        sample_size = min(sample_size or nlist * 64, count)
+        sample_rows = np.sort(rng.choice(count, size=sample_size, replace=False))
+        sample = np.asarray(matrix[sample_rows], dtype=np.float32)
+        centroids = sample[rng.choice(sample_size, size=nlist, replace=False)].copy()
+
+        for _ in range(iterations):
+            labels = _assign(sample, centroids)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, labels, sample)
+            empty = np.bincount(labels, minlength=nlist) == 0
+            # Re-seed empty lists with random sample rows so every list stays useful
+            sums[empty] = sample[rng.choice(sample_size, size=int(empty.sum()))]
+            centroids = normalize_rows(sums)
+
+        labels = _assign(matrix, centroids)
+        rows = np.argsort(labels, kind="stable").astype(np.int32)
+        offsets = np.zeros(nlist + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum(np.bincount(labels, minlength=nlist))
+        return cls(centroids, rows, offsets, {"nlist": nlist, "rows": count})
+
+    def search(self, matrix: np.ndarray, query_vectors, top_k: int, nprobe: int = 8) -> List[List[Tuple[int, float]]]:
+        """
+        Approximate top-k search that only scores rows in the ``nprobe`` closest lists.
+
+        Args:
+            matrix: The embedding matrix the index was trained on
+            query_vectors: A single query vector or a batch of them
+            top_k: Number of results per query
+            nprobe: Number of inverted lists scanned per query
+
+        Returns:
+            One list of (row index, cosine similarity) pairs per query, best first
+        """
+        queries = normalize_rows(query_vectors)
+        probes = top_k_indices(queries @ self.centroids.T, min(nprobe, self.nlist))
+
+        results = []
+        for query, lists in zip(queries, probes):
+            candidates = np.concatenate([self.rows[self.offsets[l]:self.offsets[l + 1]] for l in lists])
+            if not len(candidates):
+                results.append([])
+                continue
+            candidates.sort()  # ascending row order keeps reads from the mapped matrix sequential
+            scores = np.asarray(matrix[candidates], dtype=np.float32) @ query
+            best = top_k_indices(scores[np.newaxis, :], top_k)[0]
+            results.append([(int(candidates[i]), float(scores[i])) for i in best])
+        return results
+
+    def save(self, directory: str, extra_meta: Optional[Dict[str, Any]] = None) -> None:
+        # Rows are mapped by other workers: replace the files rather than rewrite them, metadata last
+        save_array(os.path.join(directory, IVF_CENTROIDS_FILE), self.centroids)
+        save_array(os.path.join(directory, IVF_ROWS_FILE), self.rows)
+        save_array(os.path.join(directory, IVF_OFFSETS_FILE), self.offsets)
+        self.meta.update(extra_meta or {})
+        save_json(os.path.join(directory, IVF_META_FILE), self.meta)
+
+    @classmethod
+    def load(cls, directory: str) -> Optional["IVFIndex"]:
+        meta_path = os.path.join(directory, IVF_META_FILE)
+        if not os.path.exists(meta_path):
+            return None
+        try:
+            with open(meta_path, "r", encoding="utf-8") as handle:
+                meta = json.load(handle)
+            return cls(
+                np.load(os.path.join(directory, IVF_CENTROIDS_FILE)),
+                np.load(os.path.join(directory, IVF_ROWS_FILE), mmap_mode="r"),
+                np.load(os.path.join(directory, IVF_OFFSETS_FILE)),
+                meta,
+            )
+        except (OSError, ValueError) as e:
+            print(f"⚠️  Failed to load IVF index from {directory}: {e}")
+            return None
+
+
+def load_or_train(matrix: np.ndarray, directory: str, generation: Any, nlist: Optional[int] = None) -> IVFIndex:
+    """Reuse the IVF index saved for this store generation, or train and save a new one."""
+    index = IVFIndex.load(directory)
+    if index is not None and index.meta.get("generation") == generation and (nlist is None or index.nlist == nlist):
+        return index
+
+    started = time.time()
+    print(f"🧭 Training IVF index over {len(matrix)} rows...")
+    index = IVFIndex.train(matrix, nlist=nlist)
+    index.save(directory, {"generation": generation})
+    print(f"🧭 IVF index with {index.nlist} lists built in {time.time() - started:.1f} seconds")
+    return index
+
+
+def measure_recall(
+    matrix: np.ndarray,
+    index: IVFIndex,
+    queries: np.ndarray,
+    top_k: int = 10,
+    probes: Sequence[int] = (1, 2, 4, 8, 16, 32),
+) -> List[Dict[str, float]]:
+    """
+    Compare IVF results with exact search for several probe counts.
+
+    Args:
+        matrix: Unit-length embedding matrix
+        index: IVF index trained on ``matrix``
+        queries: Query vectors (queries x dim)
+        top_k: Result depth used for recall@k
+        probes: nprobe values to evaluate
+
+    Returns:
+        One row per nprobe with recall@k and mean per-query latency in milliseconds,
+        plus the exact-search latency for reference
+    """
+    started = time.perf_counter()
+    exact = [{row for row, _ in hits} for hits in exact_search(matrix, queries, top_k)]
+    exact_ms = (time.perf_counter() - started) * 1000 / len(queries)
+
+    report = []
+    for nprobe in probes:
+        started = time.perf_counter()
+        approximate = index.search(matrix, queries, top_k, nprobe=nprobe)
+        latency_ms = (time.perf_counter() - started) * 1000 / len(queries)
+        found = sum(len(truth & {row for row, _ in hits}) for truth, hits in zip(exact, approximate))
+        report.append({
+            "nprobe": nprobe,
+            "recall": found / sum(len(truth) for truth in exact),
+            "latency_ms": latency_ms,
+            "exact_latency_ms": exact_ms,
+        })
+    return report
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    from .embedding_store import EmbeddingStore
+    from .pdf_context import INDEX_DIRECTORY
+
+    parser = argparse.ArgumentParser(description="Measure IVF recall against exact search on the PDF index.")
+    parser.add_argument("--index-dir", default=INDEX_DIRECTORY)
+    parser.add_argument("--queries", type=int, default=200, help="number of sampled queries")
+    parser.add_argument("--queries-file", help=".npy file of query vectors (default: perturbed index rows)")
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--probes", default="1,2,4,8,16,32")
+    parser.add_argument("--nlist", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    store = EmbeddingStore.open(args.index_dir)
+    if store is None or not len(store):
+        raise SystemExit(f"No embedding store found in {args.index_dir}")
+
+    matrix = store.matrix
+    if args.queries_file:
+        queries = np.load(args.queries_file)
+    else:
+        # Perturbed rows stand in for real questions that land near indexed chunks
+        rng = np.random.default_rng(1)
+        picked = rng.choice(len(matrix), size=min(args.queries, len(matrix)), replace=False)
+        queries = np.asarray(matrix[np.sort(picked)]) + rng.normal(scale=0.05, size=(len(picked), matrix.shape[1]))
+
+    index = load_or_train(matrix, args.index_dir, store.meta.get("generation"), nlist=args.nlist)
+    print(f"{'nprobe':>6}  {'recall@' + str(args.top_k):>10}  {'ivf ms':>8}  {'exact ms':>8}")
+    for row in measure_recall(matrix, index, queries, args.top_k, [int(p) for p in args.probes.split(",")]):
+        print(f"{row['nprobe']:>6}  {row['recall']:>10.3f}  {row['latency_ms']:>8.2f}  {row['exact_latency_ms']:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+import numpy as np
+
+from . import pdf_context
+from .vector_search import normalize_rows
+
+ANSWER_CACHE_ENABLED = os.getenv("ANSWER_CACHE_ENABLED", "1") != "0"
+ANSWER_CACHE_THRESHOLD = float(os.getenv("ANSWER_CACHE_THRESHOLD", "0.93"))
+ANSWER_CACHE_TTL = float(os.getenv("ANSWER_CACHE_TTL", "21600"))
+ANSWER_CACHE_SIZE = int(os.getenv("ANSWER_CACHE_SIZE", "2000"))
+
+
+class SemanticAnswerCache:
+    """
+    Generated answers keyed by query embedding, reused for near-identical questions.
+
+    Entries are scoped by language, expire after ``ttl`` seconds, and are evicted
+    least-recently-used first beyond ``maxsize`` per language. Every entry is tied
+    to the PDF index generation it was answered from; a lookup against a newer
+    generation drops the whole cache.
+    """
+
+    def __init__(self, threshold: float = ANSWER_CACHE_THRESHOLD, ttl: float = ANSWER_CACHE_TTL, maxsize: int = ANSWER_CACHE_SIZE):
+        self.threshold = threshold
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._entries: Dict[str, "OrderedDict[int, Dict[str, Any]]"] = {}
+        self._matrices: Dict[str, Any] = {}  # language -> (entry ids, stacked embeddings), rebuilt lazily
+        self._generation: Optional[Hashable] = None
+        self._next_id = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _check_generation(self, generation: Hashable) -> None:
+        if generation != self._generation:
+            self._entries.clear()
+            self._matrices.clear()
+            self._generation = generation
+
+    def _matrix(self, language: str):
+        if language not in self._matrices:
+            entries = self._entries.get(language) or {}
+            ids = list(entries)
+            vectors = np.stack([entries[i]["embedding"] for i in ids]) if ids else np.zeros((0, 0), dtype=np.float32)
+            self._matrices[language] = (ids, vectors)
+        return self._matrices[language]
+
+    def lookup(self, embedding: np.ndarray, language: str, generation: Hashable = None) -> Optional[str]:
+        """Cached answer for the most similar earlier question, if it clears the threshold."""
+        query = normalize_rows(embedding)[0]
+        with self._lock:
+            self._check_generation(generation)
+            ids, vectors = self._matrix(language)
+            if ids:
+                scores = vectors @ query
+                best = int(np.argmax(scores))
+                entry = self._entries[language].get(ids[best])
+                if entry is not None and scores[best] >= self.threshold:
+                    if entry["expires_at"] > time.monotonic():
+                        self._entries[language].move_to_end(ids[best])
+                        self.hits += 1
+                        return entry["answer"]
+                    self._remove(language, ids[best])
+            self.misses += 1
+            return None
+
+    def store(self, embedding: np.ndarray, language: str, answer: str, generation: Hashable = None) -> None:
+        if self.maxsize <= 0 or not answer:
+            return
+        with self._lock:
+            self._check_generation(generation)
+            entries = self._entries.setdefault(language, OrderedDict())
+            entries[self._next_id] = {
+                "embedding": normalize_rows(embedding)[0],
+                "answer": answer,
+                "expires_at": time.monotonic() + self.ttl,
+            }
+            self._next_id += 1
+            while len(entries) > self.maxsize:
+                entries.popitem(last=False)
+            self._matrices.pop(language, None)
+
+    def _remove(self, language: str, entry_id: int) -> None:
+        self._entries[language].pop(entry_id, None)
+        self._matrices.pop(language, None)
+
+    def invalidate(self) -> None:
+        """Drop every cached answer (e.g. after the PDF index was rebuilt)."""
+        with self._lock:
+            self._entries.clear()
+            self._matrices.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": {language: len(entries) for language, entries in self._entries.items()},
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "threshold": self.threshold,
+        }
+
+
+_ANSWER_CACHE = SemanticAnswerCache()
+
+
+def _embed(query: str) -> Optional[np.ndarray]:
+    if not ANSWER_CACHE_ENABLED or not (pdf_context.EMBEDDINGS_AVAILABLE or pdf_context.EMBEDDING_SERVER_SOCKET):
+        return None
+    try:
+        # Shares the query-embedding cache, so retrieval does not encode the question again
+        return pdf_context.encode_query(query)
+    except Exception as e:
+        print(f"⚠️  Answer cache skipped, could not embed query: {e}")
+        return None
+
+
+def get_cached_answer(query: str, language: str = "en") -> Optional[str]:
+    """
+    Answer previously generated for a near-identical question, if any.
+
+    Args:
+        query: The user's question in English
+        language: Language the cached answer is written in; answers are never shared across languages
+
+    Returns:
+        The cached answer, or None on a miss or when query embeddings are unavailable
+    """
+    embedding = _embed(query)
+    if embedding is None:
+        return None
+    return _ANSWER_CACHE.lookup(embedding, language, pdf_context.get_index_generation())
+
+
+def cache_answer(query: str, language: str, answer: str) -> None:
+    embedding = _embed(query)
+    if embedding is not None:
+        _ANSWER_CACHE.store(embedding, language, answer, pdf_context.get_index_generation())
+
+
+def invalidate_answer_cache() -> None:
+    _ANSWER_CACHE.invalidate()
+
+
+def get_answer_cache_stats() -> Dict[str, Any]:
+    return _ANSWER_CACHE.stats()
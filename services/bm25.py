@@ -0,0 +1,97 @@
+import math
+import re
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, List, Tuple
+
+import numpy as np
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+STOPWORDS = frozenset(
+    "a an and are as at be by can do does for from has have how i in is it its me my of on or "
+    "should so that the their them there these this to was what when where which who why will "
+    "with you your".split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens without stopwords or single characters."""
+    return [token for token in TOKEN_PATTERN.findall(text.lower()) if len(token) > 1 and token not in STOPWORDS]
+
+
+class BM25Index:
+    """
+    Inverted index with term and document frequencies, scored with Okapi BM25.
+
+    Each term maps to a posting list of (paragraph ids, term frequencies) stored as
+    NumPy arrays, so a query only touches the postings of its own terms.
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.postings: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        self.doc_lengths = np.zeros(0, dtype=np.float32)
+        self.avg_doc_length = 0.0
+
+    def __len__(self) -> int:
+        return len(self.doc_lengths)
+
+    @classmethod
+    def build(cls, paragraphs: Iterable[str], k1: float = 1.5, b: float = 0.75) -> "BM25Index":
+        """Tokenize every paragraph once and build the posting lists."""
+        index = cls(k1=k1, b=b)
+        doc_ids: Dict[str, List[int]] = defaultdict(list)
+        term_freqs: Dict[str, List[int]] = defaultdict(list)
+        lengths: List[int] = []
+
+        for doc_id, paragraph in enumerate(paragraphs):
+            tokens = tokenize(paragraph)
+            lengths.append(len(tokens))
+            for term, freq in Counter(tokens).items():
+                doc_ids[term].append(doc_id)
+                term_freqs[term].append(freq)
+
+        index.postings = {
+            term: (np.asarray(ids, dtype=np.int32), np.asarray(term_freqs[term], dtype=np.float32))
+            for term, ids in doc_ids.items()
+        }
+        index.doc_lengths = np.asarray(lengths, dtype=np.float32)
+        index.avg_doc_length = float(index.doc_lengths.mean()) if lengths else 0.0
+        return index
+
+    def idf(self, term: str) -> float:
+        posting = self.postings.get(term)
+        doc_freq = len(posting[0]) if posting else 0
+        return math.log(1 + (len(self) - doc_freq + 0.5) / (doc_freq + 0.5))
+
+    def search(self, query: str, top_k: int = 2) -> List[Tuple[int, float]]:
+        """
+        Rank paragraphs for a query by BM25.
+
+        Args:
+            query: Free-text query
+            top_k: Number of results to return
+
+        Returns:
+            List of (paragraph id, score) pairs, best first; empty if no term matches
+        """
+        terms = [term for term in set(tokenize(query)) if term in self.postings]
+        if not terms or not self.avg_doc_length:
+            return []
+
+        ids_parts, score_parts = [], []
+        for term in terms:
+            ids, tf = self.postings[term]
+            norm = self.k1 * (1 - self.b + self.b * self.doc_lengths[ids] / self.avg_doc_length)
+            ids_parts.append(ids)
+            score_parts.append(self.idf(term) * tf * (self.k1 + 1) / (tf + norm))
+
+        # Accumulate per-paragraph scores over the touched postings only
+        candidates, inverse = np.unique(np.concatenate(ids_parts), return_inverse=True)
+        scores = np.bincount(inverse, weights=np.concatenate(score_parts))
+
+        top_k = min(top_k, len(candidates))
+        best = np.argpartition(-scores, top_k - 1)[:top_k] if top_k < len(candidates) else np.arange(len(candidates))
+        best = best[np.argsort(-scores[best], kind="stable")]
+        return [(int(candidates[i]), float(scores[i])) for i in best]
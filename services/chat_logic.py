@@ -2,18 +2,49 @@ from typing import Any, Dict, Generator
 import time
 
 import models
-from .gemini import generate_gemini_response, generate_gemini_response_stream
+from .answer_cache import cache_answer, get_cached_answer
+from .gemini import generate_gemini_response, generate_gemini_response_stream, is_gemini_failure
+from .i18n import is_supported_language, localize_name, t
 from .market import get_market_prices, search_commodity_prices
 from .pdf_context import get_context_from_pdfs
 from .weather import get_weather
 
+# Intents whose replies are rendered from the i18n catalogue in the user's language
+LOCALIZED_INTENTS = frozenset({"weather", "market", "update_location", "update_crops"})
 
-def handle_intents(user: Dict[str, Any], english_message: str) -> str:
-    lowered = english_message.lower()
 
+def detect_intent(english_message: str) -> str:
+    """Intent a message is routed to: weather, market, update_location, update_crops or general."""
+    lowered = english_message.lower()
     if "weather" in lowered:
-        return get_weather(user.get("location", ""))
+        return "weather"
     if "market" in lowered or "price" in lowered:
+        return "market"
+    if lowered.startswith("update my location to"):
+        return "update_location"
+    if lowered.startswith("update my crops to"):
+        return "update_crops"
+    return "general"
+
+
+def reply_language(user: Dict[str, Any]) -> str:
+    """Language templated replies are rendered in; English for languages outside the catalogue."""
+    language = user.get("preferred_language") or "en"
+    return language if is_supported_language(language) else "en"
+
+
+def _crops_reply(crops_list, language: str) -> str:
+    readable = ", ".join(localize_name(crop, language) for crop in crops_list) or t("crops_none", language)
+    return t("crops_updated", language, crops=readable)
+
+
+def handle_intents(user: Dict[str, Any], english_message: str) -> str:
+    intent = detect_intent(english_message)
+    reply_lang = reply_language(user)
+
+    if intent == "weather":
+        return get_weather(user.get("location", ""), reply_lang)
+    if intent == "market":
         # Get farmer's crops and location from profile
         user_crops = user.get("crops", [])
         user_location = user.get("location", "")
@@ -22,40 +53,48 @@ def handle_intents(user: Dict[str, Any], english_message: str) -> str:
         if user_crops:
             response_parts = []
             for crop in user_crops[:3]:  # Limit to first 3 crops to avoid too long response
-                crop_prices = search_commodity_prices(crop, user_location)
+                crop_prices = search_commodity_prices(crop, user_location, reply_lang)
                 response_parts.append(crop_prices)
             return "\n\n---\n\n".join(response_parts)
         else:
             # Fallback to general market prices for their location
-            return get_market_prices(user_location)
-    if lowered.startswith("update my location to"):
+            return get_market_prices(user_location, reply_lang)
+    if intent == "update_location":
         new_location = english_message[len("update my location to"):].strip()
         if new_location:
             models.update_user_location(user["_id"], new_location)
-            return f"Your location has been updated to {new_location}."
-        return "I could not detect the new location. Please try again."
-    if lowered.startswith("update my crops to"):
+            return t("location_updated", reply_lang, location=new_location)
+        return t("location_missing", reply_lang)
+    if intent == "update_crops":
         crops_text = english_message[len("update my crops to"):].strip()
         if crops_text:
             crops_list = [item.strip() for item in crops_text.split(",") if item.strip()]
             models.update_user_crops(user["_id"], crops_list)
-            readable = ", ".join(crops_list) if crops_list else "none"
-            return f"Your crops have been updated to {readable}."
-        return "I could not detect the new crops list. Please try again."
+            return _crops_reply(crops_list, reply_lang)
+        return t("crops_missing", reply_lang)
+
+    # Answers are cached in English and app.py translates every reply, so all languages share them
+    cached = get_cached_answer(english_message, "en")
+    if cached is not None:
+        return cached
 
     pdf_context = get_context_from_pdfs(english_message)
-    return generate_gemini_response(english_message, pdf_context)
+    answer = generate_gemini_response(english_message, pdf_context)
+    if not is_gemini_failure(answer):
+        cache_answer(english_message, "en", answer)
+    return answer
 
 
 def handle_intents_stream(user: Dict[str, Any], english_message: str) -> Generator[str, None, None]:
     """Stream-enabled version of handle_intents for real-time responses."""
-    lowered = english_message.lower()
+    intent = detect_intent(english_message)
+    reply_lang = reply_language(user)
 
     # Quick responses (non-streaming)
-    if "weather" in lowered:
-        yield get_weather(user.get("location", ""))
+    if intent == "weather":
+        yield get_weather(user.get("location", ""), reply_lang)
         return
-    if "market" in lowered or "price" in lowered:
+    if intent == "market":
         # Get farmer's crops and location from profile
         user_crops = user.get("crops", [])
         user_location = user.get("location", "")
@@ -63,31 +102,36 @@ def handle_intents_stream(user: Dict[str, Any], english_message: str) -> Generat
         # If farmer has crops in profile, show prices for their crops
         if user_crops:
             for crop in user_crops[:3]:  # Limit to first 3 crops
-                crop_prices = search_commodity_prices(crop, user_location)
+                crop_prices = search_commodity_prices(crop, user_location, reply_lang)
                 yield crop_prices
                 if len(user_crops) > 1:
                     yield "\n\n---\n\n"
         else:
             # Fallback to general market prices for their location
-            yield get_market_prices(user_location)
+            yield get_market_prices(user_location, reply_lang)
         return
-    if lowered.startswith("update my location to"):
+    if intent == "update_location":
         new_location = english_message[len("update my location to"):].strip()
         if new_location:
             models.update_user_location(user["_id"], new_location)
-            yield f"Your location has been updated to {new_location}."
+            yield t("location_updated", reply_lang, location=new_location)
         else:
-            yield "I could not detect the new location. Please try again."
+            yield t("location_missing", reply_lang)
         return
-    if lowered.startswith("update my crops to"):
+    if intent == "update_crops":
         crops_text = english_message[len("update my crops to"):].strip()
         if crops_text:
             crops_list = [item.strip() for item in crops_text.split(",") if item.strip()]
             models.update_user_crops(user["_id"], crops_list)
-            readable = ", ".join(crops_list) if crops_list else "none"
-            yield f"Your crops have been updated to {readable}."
+            yield _crops_reply(crops_list, reply_lang)
         else:
-            yield "I could not detect the new crops list. Please try again."
+            yield t("crops_missing", reply_lang)
+        return
+
+    # A near-identical question answered earlier streams back immediately
+    cached = get_cached_answer(english_message, "en")
+    if cached is not None:
+        yield cached
         return
 
     # Stream Gemini response
@@ -96,5 +140,11 @@ def handle_intents_stream(user: Dict[str, Any], english_message: str) -> Generat
     pdf_time = time.time()
     print(f"⏱️  PDF context retrieval took: {pdf_time - start_time:.4f} seconds")
     
+    parts = []
+    failed = False
     for chunk in generate_gemini_response_stream(english_message, pdf_context):
+        failed = failed or is_gemini_failure(chunk)
+        parts.append(chunk)
         yield chunk
+    if not failed:
+        cache_answer(english_message, "en", "".join(parts))
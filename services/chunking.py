@@ -0,0 +1,70 @@
+import bisect
+import os
+import re
+from typing import Any, Dict, List
+
+# Word-level tokens approximate the embedding model's word pieces closely enough to
+# keep chunks under all-MiniLM-L6-v2's 256 word-piece input limit.
+TOKEN_PATTERN = re.compile(r"\w+|[^\w\s]")
+
+CHUNK_TOKENS = int(os.getenv("PDF_CHUNK_TOKENS", "160"))
+CHUNK_OVERLAP = int(os.getenv("PDF_CHUNK_OVERLAP", "32"))
+MIN_CHUNK_TOKENS = 12
+CHUNKER_VERSION = 1
+
+
+def count_tokens(text: str) -> int:
+    return len(TOKEN_PATTERN.findall(text))
+
+
+def chunker_settings() -> Dict[str, int]:
+    """Settings recorded in the index so a change triggers re-chunking."""
+    return {"version": CHUNKER_VERSION, "max_tokens": CHUNK_TOKENS, "overlap": CHUNK_OVERLAP}
+
+
+def chunk_pages(pages: List[str], source: str, max_tokens: int = CHUNK_TOKENS, overlap: int = CHUNK_OVERLAP) -> List[Dict[str, Any]]:
+    """
+    Split a document into overlapping windows of at most ``max_tokens`` tokens.
+
+    Windows run over the whole document, so a chunk may continue onto the next
+    page; it is attributed to the page its first token is on.
+
+    Args:
+        pages: Extracted text of each page, in order
+        source: Name of the source file
+        max_tokens: Upper bound on tokens per chunk
+        overlap: Tokens shared by consecutive chunks
+
+    Returns:
+        List of chunks with 'text', 'source', 'page' (1-based) and 'offset'
+        (character offset of the chunk start within that page)
+    """
+    page_starts: List[int] = []
+    position = 0
+    for page in pages:
+        page_starts.append(position)
+        position += len(page) + 1
+    full_text = "\n".join(pages)
+
+    spans = [match.span() for match in TOKEN_PATTERN.finditer(full_text)]
+    if not spans:
+        return []
+
+    step = max(max_tokens - overlap, 1)
+    chunks: List[Dict[str, Any]] = []
+    for first in range(0, len(spans), step):
+        window = spans[first:first + max_tokens]
+        # A document this short carries no useful context on its own
+        if len(window) < MIN_CHUNK_TOKENS:
+            break
+        start, end = window[0][0], window[-1][1]
+        page_index = bisect.bisect_right(page_starts, start) - 1
+        chunks.append({
+            "text": " ".join(full_text[start:end].split()),
+            "source": source,
+            "page": page_index + 1,
+            "offset": start - page_starts[page_index],
+        })
+        if first + max_tokens >= len(spans):
+            break
+    return chunks
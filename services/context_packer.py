@@ -0,0 +1,101 @@
+import math
+import os
+import re
+from typing import Any, Callable, Dict, List, Optional
+
+from .bm25 import tokenize
+from .chunking import count_tokens
+
+# Upper bound on knowledge-base tokens sent with each prompt
+PROMPT_CONTEXT_TOKENS = int(os.getenv("PROMPT_CONTEXT_TOKENS", "400"))
+# Sentences scoring below this fraction of the best sentence are dropped even if they would fit
+PROMPT_SENTENCE_MIN_SCORE = float(os.getenv("PROMPT_SENTENCE_MIN_SCORE", "0.2"))
+# Leading sentences kept from a chunk that matched only semantically
+UNMATCHED_LEAD_SENTENCES = 2
+
+SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?;])\s+(?=[^a-z])|\n{2,}")
+
+
+def split_sentences(text: str) -> List[str]:
+    return [sentence.strip() for sentence in SENTENCE_BOUNDARY.split(text) if sentence and sentence.strip()]
+
+
+def _local_idf(sentence_terms: List[set]) -> Callable[[str], float]:
+    """IDF over the candidate sentences themselves, for when no corpus index is loaded."""
+    doc_freq: Dict[str, int] = {}
+    for terms in sentence_terms:
+        for term in terms:
+            doc_freq[term] = doc_freq.get(term, 0) + 1
+    total = len(sentence_terms)
+    return lambda term: math.log(1 + (total - doc_freq.get(term, 0) + 0.5) / (doc_freq.get(term, 0) + 0.5))
+
+
+def pack_context(
+    query: str,
+    chunks: List[Dict[str, Any]],
+    max_tokens: int = PROMPT_CONTEXT_TOKENS,
+    idf: Optional[Callable[[str], float]] = None,
+) -> str:
+    """
+    Fill a token budget with the sentences of the ranked chunks that best match the query.
+
+    Each sentence is scored by the IDF-weighted query terms it contains, scaled by
+    the similarity the index gave its chunk, so a sentence from a strongly matching
+    chunk outranks the same overlap in a weak one. A chunk with no lexical overlap
+    at all (a purely semantic match) contributes its leading sentences instead.
+    Selected sentences keep their original order within each chunk.
+
+    Args:
+        query: The user's question
+        chunks: Retrieved chunks, best first, each with 'text' and optionally 'score'
+        max_tokens: Token budget for the packed context
+        idf: Term weighting function (defaults to IDF over the candidate sentences)
+
+    Returns:
+        The packed context, one paragraph per contributing chunk
+    """
+    query_terms = set(tokenize(query))
+    candidates = []  # (score, chunk rank, sentence position, text, tokens)
+    sentence_terms = []
+    for rank, chunk in enumerate(chunks):
+        for position, sentence in enumerate(split_sentences(chunk.get("text", ""))):
+            candidates.append([0.0, rank, position, sentence, count_tokens(sentence)])
+            sentence_terms.append(set(tokenize(sentence)) & query_terms)
+    if not candidates:
+        return ""
+
+    weight = idf or _local_idf(sentence_terms)
+    matched_chunks = set()
+    for candidate, terms in zip(candidates, sentence_terms):
+        overlap = sum(weight(term) for term in terms)
+        if overlap > 0:
+            chunk_score = max(float(chunks[candidate[1]].get("score", 1.0) or 0.0), 0.05)
+            # Long sentences are discounted so a few focused sentences beat one run-on
+            candidate[0] = chunk_score * overlap / math.sqrt(max(candidate[4], 1))
+            matched_chunks.add(candidate[1])
+
+    best = max(candidate[0] for candidate in candidates)
+    for candidate in candidates:
+        if candidate[1] not in matched_chunks:
+            # Semantic-only match: fall back to the chunk's opening, decaying with position and rank
+            candidate[0] = (best or 1.0) * PROMPT_SENTENCE_MIN_SCORE / (1 + candidate[1] + candidate[2])
+
+    selected = []
+    remaining = max_tokens
+    for score, rank, position, sentence, tokens in sorted(candidates, key=lambda c: (-c[0], c[1], c[2])):
+        if selected and (score < best * PROMPT_SENTENCE_MIN_SCORE if rank in matched_chunks else position >= UNMATCHED_LEAD_SENTENCES):
+            continue
+        if tokens > remaining:
+            if selected:
+                continue
+            # Never return nothing: cut the single best sentence down to the budget
+            sentence = " ".join(sentence.split()[:max_tokens])
+        selected.append((rank, position, sentence))
+        remaining -= count_tokens(sentence)
+        if remaining <= 0:
+            break
+
+    paragraphs: Dict[int, List[str]] = {}
+    for rank, position, sentence in sorted(selected):
+        paragraphs.setdefault(rank, []).append(sentence)
+    return "\n\n".join(" ".join(sentences) for sentences in paragraphs.values())
@@ -0,0 +1,91 @@
+import os
+import zlib
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .bm25 import TOKEN_PATTERN
+
+# Chunks whose estimated Jaccard similarity of word 5-shingles reaches this are collapsed
+DEDUP_THRESHOLD = float(os.getenv("PDF_DEDUP_THRESHOLD", "0.8"))
+SHINGLE_WORDS = 5
+NUM_PERMUTATIONS = 128
+LSH_BANDS = 16  # 16 bands of 8 rows: candidate pairs start around 0.7 Jaccard
+
+_PRIME = np.uint64((1 << 61) - 1)
+_rng = np.random.default_rng(20240601)
+_PERM_A = _rng.integers(1, 1 << 32, size=NUM_PERMUTATIONS, dtype=np.uint64)
+_PERM_B = _rng.integers(0, 1 << 32, size=NUM_PERMUTATIONS, dtype=np.uint64)
+_BAND_MIX = _rng.integers(1, 1 << 63, size=NUM_PERMUTATIONS // LSH_BANDS, dtype=np.uint64) | np.uint64(1)
+
+
+def minhash_signature(text: str) -> np.ndarray:
+    """MinHash signature (NUM_PERMUTATIONS uint32 values) of a text's word shingles."""
+    words = TOKEN_PATTERN.findall(text.lower())
+    if len(words) < SHINGLE_WORDS:
+        shingles = [" ".join(words)]
+    else:
+        shingles = [" ".join(words[i:i + SHINGLE_WORDS]) for i in range(len(words) - SHINGLE_WORDS + 1)]
+    hashes = np.fromiter((zlib.crc32(shingle.encode("utf-8")) for shingle in shingles), dtype=np.uint64, count=len(shingles))
+    permuted = (hashes[:, np.newaxis] * _PERM_A + _PERM_B) % _PRIME
+    return (permuted.min(axis=0) & np.uint64(0xFFFFFFFF)).astype(np.uint32)
+
+
+def minhash_signatures(texts: List[str]) -> np.ndarray:
+    if not texts:
+        return np.zeros((0, NUM_PERMUTATIONS), dtype=np.uint32)
+    return np.stack([minhash_signature(text) for text in texts])
+
+
+def _band_keys(signatures: np.ndarray) -> np.ndarray:
+    """One 64-bit bucket key per (row, band)."""
+    rows = signatures.reshape(len(signatures), LSH_BANDS, NUM_PERMUTATIONS // LSH_BANDS).astype(np.uint64)
+    return (rows * _BAND_MIX).sum(axis=2)
+
+
+class NearDuplicateIndex:
+    """
+    MinHash LSH over already-kept chunks.
+
+    Existing rows are held as per-band sorted NumPy arrays (cheap for large
+    indexes); rows kept during the current run go into small per-band dicts.
+    """
+
+    def __init__(self, signatures: Optional[np.ndarray] = None, owners: Optional[List[str]] = None, threshold: float = DEDUP_THRESHOLD):
+        self.threshold = threshold
+        self.signatures: List[np.ndarray] = []
+        self.owners: List[str] = []
+        self._base = signatures if signatures is not None else np.zeros((0, NUM_PERMUTATIONS), dtype=np.uint32)
+        self._base_owners = owners or []
+        base_keys = _band_keys(self._base)
+        self._base_order = np.argsort(base_keys, axis=0, kind="stable")
+        self._base_sorted = np.take_along_axis(base_keys, self._base_order, axis=0)
+        self._buckets: List[Dict[int, List[int]]] = [dict() for _ in range(LSH_BANDS)]
+
+    def _candidates(self, keys: np.ndarray) -> Tuple[set, set]:
+        base, added = set(), set()
+        for band, key in enumerate(keys):
+            column = self._base_sorted[:, band]
+            lo, hi = np.searchsorted(column, key, side="left"), np.searchsorted(column, key, side="right")
+            base.update(int(row) for row in self._base_order[lo:hi, band])
+            added.update(self._buckets[band].get(int(key), ()))
+        return base, added
+
+    def find_duplicate(self, signature: np.ndarray) -> Optional[str]:
+        """Owner of an already-kept near-duplicate of ``signature``, or None."""
+        keys = _band_keys(signature[np.newaxis, :])[0]
+        base, added = self._candidates(keys)
+        for row in base:
+            if np.mean(self._base[row] == signature) >= self.threshold:
+                return self._base_owners[row] if row < len(self._base_owners) else ""
+        for row in added:
+            if np.mean(self.signatures[row] == signature) >= self.threshold:
+                return self.owners[row]
+        return None
+
+    def add(self, signature: np.ndarray, owner: str) -> None:
+        row = len(self.signatures)
+        self.signatures.append(signature)
+        self.owners.append(owner)
+        for band, key in enumerate(_band_keys(signature[np.newaxis, :])[0]):
+            self._buckets[band].setdefault(int(key), []).append(row)
@@ -0,0 +1,129 @@
+"""
+Local embedding/retrieval server shared by all web workers on a host.
+
+One process loads the sentence-transformer and the PDF index and answers
+newline-delimited JSON requests on a Unix socket:
+
+    {"op": "ping"}
+    {"op": "search", "queries": [...], "top_k": 2}   -> {"results": [[chunk, ...], ...]}
+    {"op": "encode", "queries": [...]}               -> {"embeddings": [[float, ...], ...]}
+
+Start it with ``python -m services.embedding_server --socket /run/agri/embed.sock``
+and point the web workers at it with ``EMBEDDING_SERVER_SOCKET``.
+"""
+import argparse
+import json
+import os
+import socket
+import socketserver
+from typing import Any, Callable, Dict, List, Optional
+
+
+class EmbeddingClient:
+    """
+    Thin client for the embedding server; one short-lived connection per request.
+
+    Every reply carries the server's index generation, passed to ``on_generation``
+    so callers notice a server restarted on a rebuilt index.
+    """
+
+    def __init__(self, socket_path: str, timeout: float = 5.0, on_generation: Optional[Callable[[Any], None]] = None):
+        self.socket_path = socket_path
+        self.timeout = timeout
+        self.on_generation = on_generation
+
+    def request(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as conn:
+            conn.settimeout(self.timeout)
+            conn.connect(self.socket_path)
+            conn.sendall(json.dumps(payload).encode("utf-8") + b"\n")
+            with conn.makefile("rb") as reader:
+                line = reader.readline()
+        if not line:
+            raise ConnectionError("embedding server closed the connection")
+        response = json.loads(line)
+        if "error" in response:
+            raise RuntimeError(f"embedding server error: {response['error']}")
+        if self.on_generation is not None and "generation" in response:
+            self.on_generation(response["generation"])
+        return response
+
+    def status(self) -> Optional[Dict[str, Any]]:
+        """The server's ping response (chunk count, index generation), or None if unreachable."""
+        try:
+            response = self.request({"op": "ping"})
+        except (OSError, ValueError, RuntimeError):
+            return None
+        return response if response.get("ok") else None
+
+    def ping(self) -> bool:
+        return self.status() is not None
+
+    def search(self, queries: List[str], top_k: int) -> List[List[Dict[str, Any]]]:
+        return self.request({"op": "search", "queries": queries, "top_k": top_k})["results"]
+
+    def encode(self, queries: List[str]) -> List[List[float]]:
+        return self.request({"op": "encode", "queries": queries})["embeddings"]
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    def handle(self) -> None:
+        from . import pdf_context
+
+        for line in self.rfile:
+            try:
+                payload = json.loads(line)
+                op = payload.get("op")
+                if op == "ping":
+                    response: Dict[str, Any] = {
+                        "ok": True,
+                        "chunks": len(pdf_context._PDF_CACHE["paragraphs"]),
+                    }
+                elif op == "search":
+                    response = {"results": pdf_context.get_context_chunks_batch(payload["queries"], int(payload.get("top_k", 2)))}
+                elif op == "encode":
+                    response = {"embeddings": pdf_context.encode_queries(payload["queries"]).tolist()}
+                else:
+                    response = {"error": f"unknown op {op!r}"}
+                if "error" not in response:
+                    response["generation"] = pdf_context.get_index_generation()
+            except Exception as e:
+                response = {"error": str(e)}
+            self.wfile.write(json.dumps(response).encode("utf-8") + b"\n")
+            self.wfile.flush()
+
+
+class EmbeddingServer(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+
+
+def serve(socket_path: str) -> None:
+    """Load the model and index once, then serve requests until interrupted."""
+    from . import pdf_context
+
+    # This process *is* the server: always answer from the in-process index
+    pdf_context.EMBEDDING_SERVER_SOCKET = None
+    pdf_context._load_pdfs_and_create_embeddings()
+
+    if os.path.exists(socket_path):
+        os.unlink(socket_path)
+    with EmbeddingServer(socket_path, _RequestHandler) as server:
+        os.chmod(socket_path, 0o660)
+        print(f"🧠 Embedding server listening on {socket_path}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            os.unlink(socket_path)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Serve embeddings and PDF retrieval to local web workers.")
+    parser.add_argument("--socket", default=os.getenv("EMBEDDING_SERVER_SOCKET", "/tmp/agri-embedding.sock"))
+    args = parser.parse_args(argv)
+    serve(args.socket)
+
+
+if __name__ == "__main__":
+    main()
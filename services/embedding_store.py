@@ -0,0 +1,288 @@
+"""
+On-disk chunk/embedding store shared by every worker through the OS page cache.
+
+Layout of a store directory (format version 2):
+
+    meta.json        format version, row count, embedding dimension, dtype and source names
+    embeddings.f32   raw row-major float32 matrix of unit-length embeddings
+    paragraphs.txt   UTF-8 chunk texts concatenated back to back
+    paragraphs.idx   little-endian uint64 byte offsets (row count + 1 entries)
+    chunks.pos       little-endian int32 (source index, page, offset) triple per row
+    chunks.minhash   optional little-endian uint32 MinHash signature per row (near-duplicate detection)
+
+Version 1 stores (no chunks.pos) are still readable; their rows carry no metadata.
+
+The matrix and text files are opened with mmap, so opening a store costs no deserialization
+and every process that opens the same directory shares the same physical pages.
+"""
+import json
+import mmap
+import os
+import pickle
+import uuid
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+import numpy as np
+
+from .vector_search import normalize_rows
+
+STORE_FORMAT_VERSION = 2
+READABLE_VERSIONS = (1, 2)
+
+META_FILE = "meta.json"
+EMBEDDINGS_FILE = "embeddings.f32"
+TEXT_FILE = "paragraphs.txt"
+OFFSETS_FILE = "paragraphs.idx"
+POSITIONS_FILE = "chunks.pos"
+SIGNATURES_FILE = "chunks.minhash"
+
+
+def _map_file(path: str) -> Optional[mmap.mmap]:
+    if os.path.getsize(path) == 0:
+        return None
+    with open(path, "rb") as handle:
+        return mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def _replace_file(path: str, payload: bytes) -> None:
+    tmp_path = f"{path}.tmp-{os.getpid()}"
+    with open(tmp_path, "wb") as handle:
+        handle.write(payload)
+        handle.flush()
+        os.fsync(handle.fileno())
+    os.replace(tmp_path, path)
+
+
+def save_array(path: str, array: np.ndarray) -> None:
+    """Write ``array`` as a .npy file through a temporary file and a rename; readers mapping the old file keep it intact."""
+    tmp_path = f"{path}.tmp-{os.getpid()}"
+    with open(tmp_path, "wb") as handle:
+        np.save(handle, array)
+        handle.flush()
+        os.fsync(handle.fileno())
+    os.replace(tmp_path, path)
+
+
+def save_json(path: str, data: Dict[str, Any]) -> None:
+    """Atomically replace a JSON metadata file."""
+    _replace_file(path, json.dumps(data, indent=2).encode("utf-8"))
+
+
+class ParagraphStore(Sequence[str]):
+    """Read-only sequence of paragraphs decoded on demand from a mapped text file."""
+
+    def __init__(self, text_path: str, offsets_path: str):
+        self._text = _map_file(text_path)
+        self._offsets = np.fromfile(offsets_path, dtype="<u8")
+
+    def __len__(self) -> int:
+        return max(len(self._offsets) - 1, 0)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if index < 0 or index >= len(self):
+            raise IndexError("paragraph index out of range")
+        start, end = int(self._offsets[index]), int(self._offsets[index + 1])
+        if self._text is None or start == end:
+            return ""
+        return self._text[start:end].decode("utf-8")
+
+    def __iter__(self) -> Iterator[str]:
+        for index in range(len(self)):
+            yield self[index]
+
+
+class ChunkMetadata(Sequence[Dict[str, Any]]):
+    """Read-only sequence of {'source', 'page', 'offset'} records backed by chunks.pos."""
+
+    def __init__(self, positions: np.ndarray, sources: List[str]):
+        self._positions = positions
+        self._sources = sources
+
+    def __len__(self) -> int:
+        return len(self._positions)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        source, page, offset = (int(value) for value in self._positions[index])
+        return {"source": self._sources[source], "page": page, "offset": offset}
+
+
+class EmbeddingStore:
+    """A memory-mapped embedding matrix plus its offset-indexed chunk texts and positions."""
+
+    def __init__(
+        self,
+        directory: str,
+        meta: Dict[str, Any],
+        matrix: np.ndarray,
+        paragraphs: ParagraphStore,
+        metadata: Optional[ChunkMetadata] = None,
+        signatures: Optional[np.ndarray] = None,
+    ):
+        self.directory = directory
+        self.meta = meta
+        self.matrix = matrix
+        self.paragraphs = paragraphs
+        self.metadata = metadata
+        self.signatures = signatures
+
+    def __len__(self) -> int:
+        return len(self.paragraphs)
+
+    @classmethod
+    def open(cls, directory: str) -> Optional["EmbeddingStore"]:
+        """
+        Open an existing store without copying it into process memory.
+
+        Args:
+            directory: Store directory written by ``write``
+
+        Returns:
+            The opened store, or None if the directory holds no usable store
+        """
+        try:
+            return cls._open(directory)
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            # Corrupt metadata or missing files: treat as no store so the caller rebuilds it
+            print(f"⚠️  Could not open embedding store in {directory}: {e}")
+            return None
+
+    @classmethod
+    def _open(cls, directory: str) -> Optional["EmbeddingStore"]:
+        meta_path = os.path.join(directory, META_FILE)
+        if not os.path.exists(meta_path):
+            return None
+
+        with open(meta_path, "r", encoding="utf-8") as handle:
+            meta = json.load(handle)
+
+        if meta.get("version") not in READABLE_VERSIONS:
+            print(f"⚠️  Unsupported embedding store version {meta.get('version')} in {directory}")
+            return None
+
+        count, dim = int(meta["count"]), int(meta["dim"])
+        paragraphs = ParagraphStore(os.path.join(directory, TEXT_FILE), os.path.join(directory, OFFSETS_FILE))
+        if len(paragraphs) != count:
+            print(f"⚠️  Embedding store in {directory} is incomplete ({len(paragraphs)} of {count} paragraphs)")
+            return None
+
+        embeddings_path = os.path.join(directory, EMBEDDINGS_FILE)
+        if count and dim:
+            if os.path.getsize(embeddings_path) != count * dim * 4:
+                print(f"⚠️  Embedding matrix in {directory} does not match its metadata")
+                return None
+            matrix = np.memmap(embeddings_path, dtype="<f4", mode="r", shape=(count, dim))
+        else:
+            matrix = np.zeros((count, dim), dtype=np.float32)
+
+        metadata = None
+        positions_path = os.path.join(directory, POSITIONS_FILE)
+        if meta["version"] >= 2 and meta.get("sources") and os.path.exists(positions_path):
+            positions = np.fromfile(positions_path, dtype="<i4").reshape(-1, 3)
+            if len(positions) == count:
+                metadata = ChunkMetadata(positions, meta.get("sources", []))
+
+        signatures = None
+        signatures_path = os.path.join(directory, SIGNATURES_FILE)
+        width = int(meta.get("signature_width", 0))
+        if width and count and os.path.exists(signatures_path) and os.path.getsize(signatures_path) == count * width * 4:
+            signatures = np.memmap(signatures_path, dtype="<u4", mode="r", shape=(count, width))
+
+        return cls(directory, meta, matrix, paragraphs, metadata, signatures)
+
+    @classmethod
+    def write(
+        cls,
+        directory: str,
+        paragraphs: List[str],
+        embeddings,
+        extra_meta: Optional[Dict[str, Any]] = None,
+        metadata: Optional[Sequence[Dict[str, Any]]] = None,
+        signatures: Optional[np.ndarray] = None,
+    ) -> "EmbeddingStore":
+        """
+        Write a new store, replacing any previous one in ``directory``.
+
+        Args:
+            directory: Target store directory (created if missing)
+            paragraphs: Chunk texts, one per embedding row
+            embeddings: Embedding matrix (rows x dim); rows are normalized before writing
+            extra_meta: Additional JSON-serializable fields to record in meta.json
+            metadata: Optional {'source', 'page', 'offset'} record per row
+            signatures: Optional MinHash signature matrix (rows x permutations)
+
+        Returns:
+            The freshly written store, opened from disk
+        """
+        os.makedirs(directory, exist_ok=True)
+
+        matrix = normalize_rows(embeddings) if len(paragraphs) else np.zeros((0, 0), dtype=np.float32)
+        if len(matrix) != len(paragraphs):
+            raise ValueError(f"{len(paragraphs)} paragraphs but {len(matrix)} embeddings")
+
+        encoded = [paragraph.encode("utf-8") for paragraph in paragraphs]
+        offsets = np.zeros(len(encoded) + 1, dtype="<u8")
+        if encoded:
+            offsets[1:] = np.cumsum([len(chunk) for chunk in encoded])
+
+        sources: List[str] = []
+        positions = np.zeros((len(paragraphs), 3), dtype="<i4")
+        if metadata is not None:
+            source_ids: Dict[str, int] = {}
+            for row, record in enumerate(metadata):
+                source = source_ids.setdefault(record["source"], len(source_ids))
+                positions[row] = (source, record["page"], record["offset"])
+            sources = list(source_ids)
+
+        meta = dict(extra_meta or {})
+        meta.update({
+            "sources": sources,
+            "generation": uuid.uuid4().hex,  # lets derived indexes detect a rewritten store
+            "signature_width": int(signatures.shape[1]) if signatures is not None and len(signatures) else 0,
+            "version": STORE_FORMAT_VERSION,
+            "count": len(paragraphs),
+            "dim": int(matrix.shape[1]) if matrix.ndim == 2 else 0,
+            "dtype": "float32",
+        })
+
+        _replace_file(os.path.join(directory, EMBEDDINGS_FILE), matrix.astype("<f4").tobytes())
+        _replace_file(os.path.join(directory, TEXT_FILE), b"".join(encoded))
+        _replace_file(os.path.join(directory, OFFSETS_FILE), offsets.tobytes())
+        _replace_file(os.path.join(directory, POSITIONS_FILE), positions.tobytes())
+        if signatures is not None:
+            _replace_file(os.path.join(directory, SIGNATURES_FILE), np.asarray(signatures, dtype="<u4").tobytes())
+        # meta.json goes last so readers never see metadata for data that is not on disk yet
+        _replace_file(os.path.join(directory, META_FILE), json.dumps(meta, indent=2).encode("utf-8"))
+
+        return cls.open(directory)
+
+
+def migrate_pickle_cache(pickle_path: str, directory: str) -> Optional[EmbeddingStore]:
+    """
+    Convert the legacy ``.pdf_embeddings_cache.pkl`` file into an embedding store.
+
+    Args:
+        pickle_path: Path of the pickled {"paragraphs", "embeddings"} cache
+        directory: Store directory to write
+
+    Returns:
+        The new store, or None if the pickle could not be converted
+    """
+    try:
+        with open(pickle_path, "rb") as handle:
+            cache_data = pickle.load(handle)
+        paragraphs = list(cache_data["paragraphs"])
+        embeddings = cache_data.get("embeddings")
+        if embeddings is None:
+            return None
+        store = EmbeddingStore.write(directory, paragraphs, embeddings, {"migrated_from": os.path.basename(pickle_path)})
+        print(f"🔁 Migrated {len(paragraphs)} paragraphs from {pickle_path} to {directory}")
+        return store
+    except Exception as e:
+        print(f"⚠️  Failed to migrate pickle cache: {e}")
+        return None
@@ -1,39 +1,146 @@
 import os
-from typing import List, Optional, Generator
+import threading
+import time
+from functools import partial
+from typing import Any, Dict, List, Optional, Generator
 
 try:
     import google.generativeai as genai
 except ImportError:  # pragma: no cover
     genai = None
 
+from .chunking import count_tokens
+from .context_packer import PROMPT_CONTEXT_TOKENS, pack_context
+from .gemini_pool import ModelPool
+from .hedging import HedgeStats, hedged_stream
+
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
 GEMINI_MODEL = os.getenv("GEMINI_MODEL", "gemini-1.5-flash-latest")
+# "stub" answers from soak.stubs in-process, for load tests without the real API
+GEMINI_BACKEND = os.getenv("GEMINI_BACKEND", "google").lower()
+
+# Opt-in: if the first chunk is slower than the budget, race the next model against it
+GEMINI_HEDGE_ENABLED = os.getenv("GEMINI_HEDGE_ENABLED", "0") == "1"
+GEMINI_HEDGE_BUDGET_MS = float(os.getenv("GEMINI_HEDGE_BUDGET_MS", "1500"))
 
 AVAILABLE_GEMINI_MODELS: List[str] = []
 _GEMINI_READY = False
+_GEMINI_INITIALIZED = False
+_INIT_LOCK = threading.Lock()
+
+STREAM_GENERATION_CONFIG = {
+    "temperature": 0.7,
+    "top_p": 0.9,
+    "top_k": 40,
+    "max_output_tokens": 2048,  # Increased from 1024 to allow longer responses
+}
+PREFERRED_GEMINI_MODELS = ["gemini-1.5-flash-latest", "gemini-1.5-pro-latest", "gemini-pro"]
+
+# Reused GenerativeModel handles plus per-model circuit breakers and latency stats
+def _model_factory(name: str):
+    if GEMINI_BACKEND == "stub":
+        from soak.stubs import StubGenerativeModel
+
+        return StubGenerativeModel(name)
+    return genai.GenerativeModel(name)
+
+
+_MODEL_POOL = ModelPool(_model_factory)
+_HEDGE_STATS = HedgeStats()
+
+
+def init_gemini() -> bool:
+    """Configure the SDK and list the usable models once, on first use or during warm-up."""
+    global AVAILABLE_GEMINI_MODELS, _GEMINI_READY, _GEMINI_INITIALIZED
+    if _GEMINI_INITIALIZED:
+        return _GEMINI_READY
+
+    with _INIT_LOCK:
+        if _GEMINI_INITIALIZED:
+            return _GEMINI_READY
+        if GEMINI_BACKEND == "stub":
+            AVAILABLE_GEMINI_MODELS = [GEMINI_MODEL]
+            _GEMINI_READY = True
+        elif GEMINI_API_KEY and genai:
+            try:
+                genai.configure(api_key=GEMINI_API_KEY)
+                AVAILABLE_GEMINI_MODELS = [
+                    model.name
+                    for model in genai.list_models()
+                    if "generateContent" in getattr(model, "supported_generation_methods", [])
+                ]
+                _GEMINI_READY = True
+            except Exception:
+                AVAILABLE_GEMINI_MODELS = []
+                _GEMINI_READY = False
+        _GEMINI_INITIALIZED = True
+    return _GEMINI_READY
+
+
+def is_gemini_initialized() -> bool:
+    return _GEMINI_INITIALIZED
+
+
+# Every fallback message starts with one of these; such text must never be cached or reused
+_FAILURE_PREFIXES = ("Gemini service is unavailable", "Gemini request failed")
+
+
+def is_gemini_failure(text: str) -> bool:
+    return text.lstrip().startswith(_FAILURE_PREFIXES)
+
+
+def _candidate_models(model_overrides: Optional[List[str]] = None) -> List[str]:
+    """Configured, override and discovered model names, de-duplicated in preference order."""
+    candidate_models: List[str] = []
+    seen = set()
+    for model_name in [GEMINI_MODEL] + PREFERRED_GEMINI_MODELS + (model_overrides or []) + AVAILABLE_GEMINI_MODELS:
+        normalized = (model_name or "").strip()
+        if not normalized or normalized in seen:
+            continue
+        seen.add(normalized)
+        candidate_models.append(normalized)
+    return candidate_models
+
+
+def get_model_stats() -> Dict[str, Dict[str, Any]]:
+    """Circuit state, smoothed latency and error rate of every model tried so far."""
+    return _MODEL_POOL.stats()
+
+
+def get_hedge_stats() -> Dict[str, Any]:
+    return {"enabled": GEMINI_HEDGE_ENABLED, "budget_ms": GEMINI_HEDGE_BUDGET_MS, **_HEDGE_STATS.snapshot()}
 
-if GEMINI_API_KEY and genai:
-    try:
-        genai.configure(api_key=GEMINI_API_KEY)
-        AVAILABLE_GEMINI_MODELS = [
-            model.name
-            for model in genai.list_models()
-            if "generateContent" in getattr(model, "supported_generation_methods", [])
-        ]
-        _GEMINI_READY = True
-    except Exception:
-        AVAILABLE_GEMINI_MODELS = []
-        _GEMINI_READY = False
-else:
-    AVAILABLE_GEMINI_MODELS = []
-    _GEMINI_READY = False
+
+class _ResponseStream:
+    """Text chunks of one streaming response; ``cancel`` lets the hedger stop a losing attempt from another thread."""
+
+    def __init__(self, model_name: str, prompt: str):
+        self.response = _MODEL_POOL.handle(model_name).generate_content(prompt, stream=True, generation_config=STREAM_GENERATION_CONFIG)
+
+    def __iter__(self) -> Generator[str, None, None]:
+        for chunk in self.response:
+            if hasattr(chunk, 'text') and chunk.text:
+                yield chunk.text
+
+    def cancel(self) -> None:
+        # The SDK keeps the transport's stream (gRPC call or REST response iterator) on the
+        # response; both support cancel(), which unblocks a reader waiting for the next chunk
+        transport = getattr(self.response, "_iterator", None)
+        if transport is not None and hasattr(transport, "cancel"):
+            transport.cancel()
+
+
+def _stream_attempts(prompt: str, candidate_models: List[str]):
+    """Healthy models in try order, claimed one at a time as the hedger needs them."""
+    for model_name in _MODEL_POOL.order(candidate_models):
+        if _MODEL_POOL.acquire(model_name):
+            yield model_name, partial(_ResponseStream, model_name, prompt)
 
 
 def _build_prompt(user_query: str, pdf_context: str) -> str:
-    # Limit PDF context to avoid extremely long prompts that slow down API
-    max_context_chars = 3000  # Reduced from unlimited to 3000 chars
-    if len(pdf_context) > max_context_chars:
-        pdf_context = pdf_context[:max_context_chars] + "\n...[Context truncated for performance]"
+    # Context from get_context_from_pdfs is already packed; anything larger is compressed to the budget
+    if count_tokens(pdf_context) > PROMPT_CONTEXT_TOKENS:
+        pdf_context = pack_context(user_query, [{"text": pdf_context}])
     
     return (
         f"You are an expert agricultural assistant. Use the following knowledge base to answer questions:\n\n"
@@ -47,24 +154,13 @@ def _build_prompt(user_query: str, pdf_context: str) -> str:
 
 def generate_gemini_response(user_query: str, pdf_context: str, model_overrides: Optional[List[str]] = None) -> str:
     prompt = _build_prompt(user_query, pdf_context)
-    if not _GEMINI_READY:
+    if not init_gemini():
         return (
             "Gemini service is unavailable right now. Based on the documents, here's a drafted response:\n\n"
             f"{prompt}"
         )
 
-    candidate_models: List[str] = []
-    seen = set()
-    preferred = [GEMINI_MODEL, "gemini-1.5-flash-latest", "gemini-1.5-pro-latest", "gemini-pro"]
-
-    for model_name in preferred + (model_overrides or []) + AVAILABLE_GEMINI_MODELS:
-        if not model_name:
-            continue
-        normalized = model_name.strip()
-        if not normalized or normalized in seen:
-            continue
-        seen.add(normalized)
-        candidate_models.append(normalized)
+    candidate_models = _candidate_models(model_overrides)
 
     if not candidate_models:
         return (
@@ -75,13 +171,17 @@ def generate_gemini_response(user_query: str, pdf_context: str, model_overrides:
         )
 
     last_exception: Optional[Exception] = None
-    for model_name in candidate_models:
+    for model_name in _MODEL_POOL.order(candidate_models):
+        if not _MODEL_POOL.acquire(model_name):
+            continue
+        started = time.monotonic()
         try:
-            model = genai.GenerativeModel(model_name)
-            response = model.generate_content(prompt)
+            response = _MODEL_POOL.handle(model_name).generate_content(prompt)
         except Exception as exc:
+            _MODEL_POOL.record_failure(model_name, exc)
             last_exception = exc
             continue
+        _MODEL_POOL.record_success(model_name, time.monotonic() - started)
 
         if hasattr(response, "text") and response.text:
             return response.text.strip()
@@ -99,7 +199,7 @@ def generate_gemini_response(user_query: str, pdf_context: str, model_overrides:
         if collected_parts:
             return "\n\n".join(collected_parts).strip()
 
-    reason = last_exception if last_exception else "No Gemini models returned usable text."
+    reason = last_exception if last_exception else "No healthy Gemini models returned usable text."
     return (
         "Gemini request failed. Falling back to context summary.\n\n"
         f"Reason: {reason}\n\nPrompt used:\n{prompt}"
@@ -110,48 +210,57 @@ def generate_gemini_response_stream(user_query: str, pdf_context: str, model_ove
     """Stream Gemini response in real-time for faster perceived performance."""
     prompt = _build_prompt(user_query, pdf_context)
     
-    if not _GEMINI_READY:
+    if not init_gemini():
         yield "Gemini service is unavailable right now."
         return
 
-    candidate_models: List[str] = []
-    seen = set()
-    preferred = [GEMINI_MODEL, "gemini-1.5-flash-latest", "gemini-1.5-pro-latest", "gemini-pro"]
-
-    for model_name in preferred + (model_overrides or []) + AVAILABLE_GEMINI_MODELS:
-        if not model_name:
-            continue
-        normalized = model_name.strip()
-        if not normalized or normalized in seen:
-            continue
-        seen.add(normalized)
-        candidate_models.append(normalized)
+    candidate_models = _candidate_models(model_overrides)
 
     if not candidate_models:
         yield "Gemini request failed. No models available."
         return
 
+    if GEMINI_HEDGE_ENABLED:
+        error = yield from hedged_stream(
+            _stream_attempts(prompt, candidate_models),
+            GEMINI_HEDGE_BUDGET_MS / 1000,
+            _HEDGE_STATS,
+            on_first_chunk=_MODEL_POOL.record_success,
+            on_error=_MODEL_POOL.record_failure,
+        )
+        if error is not None:
+            yield f"Gemini request failed: {error}"
+        return
+
     last_exception: Optional[Exception] = None
-    for model_name in candidate_models:
+    for model_name in _MODEL_POOL.order(candidate_models):
+        if not _MODEL_POOL.acquire(model_name):
+            continue
+        started = time.monotonic()
+        first_chunk = True
         try:
-            model = genai.GenerativeModel(model_name)
             # Enable streaming with stream=True and optimize generation config
-            generation_config = {
-                "temperature": 0.7,
-                "top_p": 0.9,
-                "top_k": 40,
-                "max_output_tokens": 2048,  # Increased from 1024 to allow longer responses
-            }
-            response = model.generate_content(prompt, stream=True, generation_config=generation_config)
+            response = _MODEL_POOL.handle(model_name).generate_content(prompt, stream=True, generation_config=STREAM_GENERATION_CONFIG)
             
             for chunk in response:
                 if hasattr(chunk, 'text') and chunk.text:
+                    if first_chunk:
+                        # Time to first token is what users wait on, so it drives model ordering
+                        _MODEL_POOL.record_success(model_name, time.monotonic() - started)
+                        first_chunk = False
                     yield chunk.text
+            if first_chunk:
+                _MODEL_POOL.record_success(model_name, time.monotonic() - started)
             return  # Successfully streamed
             
         except Exception as exc:
+            _MODEL_POOL.record_failure(model_name, exc)
+            if not first_chunk:
+                # Part of this model's answer is already out; another model's would be spliced onto it
+                yield f"Gemini request failed: {exc}"
+                return
             last_exception = exc
             continue
 
     # If all models failed
-    yield f"Gemini request failed: {last_exception}"
+    yield f"Gemini request failed: {last_exception or 'all models are cooling down after recent errors'}"
@@ -0,0 +1,164 @@
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+GEMINI_BREAKER_FAILURES = int(os.getenv("GEMINI_BREAKER_FAILURES", "2"))
+GEMINI_BREAKER_COOLDOWN = float(os.getenv("GEMINI_BREAKER_COOLDOWN", "30"))
+GEMINI_BREAKER_MAX_COOLDOWN = float(os.getenv("GEMINI_BREAKER_MAX_COOLDOWN", "600"))
+GEMINI_STATS_ALPHA = float(os.getenv("GEMINI_STATS_ALPHA", "0.2"))
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class ModelHealth:
+    """Circuit-breaker state and smoothed latency/error statistics of one model."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.cooldown = GEMINI_BREAKER_COOLDOWN
+        self.opened_at = 0.0
+        self.probe_started: Optional[float] = None
+        self.latency_ewma: Optional[float] = None
+        self.error_ewma = 0.0
+        self.successes = 0
+        self.failures = 0
+
+    def expected_cost(self) -> float:
+        """Seconds a request is expected to cost here, retries on failure included."""
+        if self.latency_ewma is None:
+            return float("inf")
+        return self.latency_ewma / max(1.0 - self.error_ewma, 0.05)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "latency_ewma": round(self.latency_ewma, 4) if self.latency_ewma is not None else None,
+            "error_rate": round(self.error_ewma, 4),
+            "successes": self.successes,
+            "failures": self.failures,
+            "cooldown": self.cooldown,
+        }
+
+
+class ModelPool:
+    """
+    Reusable model handles plus a circuit breaker per model.
+
+    A model opens after ``failure_threshold`` consecutive failures and is skipped
+    for its cooldown; afterwards one half-open probe request is let through. A
+    failed probe re-opens it with a doubled cooldown (capped), a success closes it.
+    Healthy models are tried cheapest first by smoothed latency and error rate.
+    """
+
+    def __init__(
+        self,
+        factory: Callable[[str], Any],
+        failure_threshold: int = GEMINI_BREAKER_FAILURES,
+        cooldown: float = GEMINI_BREAKER_COOLDOWN,
+        max_cooldown: float = GEMINI_BREAKER_MAX_COOLDOWN,
+        alpha: float = GEMINI_STATS_ALPHA,
+    ):
+        self.factory = factory
+        self.failure_threshold = max(failure_threshold, 1)
+        self.base_cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.alpha = alpha
+        self._handles: Dict[str, Any] = {}
+        self._health: Dict[str, ModelHealth] = {}
+        self._lock = threading.Lock()
+
+    def _state(self, name: str) -> ModelHealth:
+        health = self._health.get(name)
+        if health is None:
+            health = self._health[name] = ModelHealth(name)
+            health.cooldown = self.base_cooldown
+        return health
+
+    def handle(self, name: str) -> Any:
+        """Model object for ``name``, created once and reused across requests."""
+        with self._lock:
+            handle = self._handles.get(name)
+        if handle is None:
+            handle = self.factory(name)
+            with self._lock:
+                handle = self._handles.setdefault(name, handle)
+        return handle
+
+    def order(self, names: List[str]) -> List[str]:
+        """
+        Candidate models in the order they should be tried.
+
+        Args:
+            names: Candidate model names in configured preference order
+
+        Returns:
+            Closed models cheapest first (untried ones in preference order after
+            measured ones), then models whose cooldown has elapsed. Models still
+            cooling down are left out.
+        """
+        now = time.monotonic()
+        with self._lock:
+            closed, probing = [], []
+            for position, name in enumerate(names):
+                health = self._state(name)
+                if health.state == CLOSED:
+                    closed.append((health.expected_cost(), health.error_ewma, position, name))
+                elif now - health.opened_at >= health.cooldown:
+                    probing.append(name)
+        return [name for *_, name in sorted(closed)] + probing
+
+    def acquire(self, name: str) -> bool:
+        """Whether a request may go to ``name`` now; claims the half-open probe slot if needed."""
+        now = time.monotonic()
+        with self._lock:
+            health = self._state(name)
+            if health.state == CLOSED:
+                return True
+            if health.state == OPEN and now - health.opened_at >= health.cooldown:
+                health.state = HALF_OPEN
+                health.probe_started = now
+                return True
+            # A probe that never reported back (abandoned request) frees its slot after a cooldown
+            if health.state == HALF_OPEN and now - (health.probe_started or 0.0) >= health.cooldown:
+                health.probe_started = now
+                return True
+            return False
+
+    def record_success(self, name: str, latency: float) -> None:
+        with self._lock:
+            health = self._state(name)
+            health.successes += 1
+            health.consecutive_failures = 0
+            health.latency_ewma = latency if health.latency_ewma is None else (
+                self.alpha * latency + (1 - self.alpha) * health.latency_ewma
+            )
+            health.error_ewma *= 1 - self.alpha
+            if health.state != CLOSED:
+                print(f"✅ Gemini model {name} recovered, closing its circuit")
+            health.state = CLOSED
+            health.cooldown = self.base_cooldown
+            health.probe_started = None
+
+    def record_failure(self, name: str, error: Optional[BaseException] = None) -> None:
+        with self._lock:
+            health = self._state(name)
+            health.failures += 1
+            health.consecutive_failures += 1
+            health.error_ewma = self.alpha + (1 - self.alpha) * health.error_ewma
+            if health.state == HALF_OPEN:
+                health.cooldown = min(health.cooldown * 2, self.max_cooldown)
+            elif health.state == OPEN or health.consecutive_failures < self.failure_threshold:
+                return
+            health.state = OPEN
+            health.opened_at = time.monotonic()
+            health.probe_started = None
+        print(f"⚠️  Gemini model {name} failing ({error}), skipping it for {health.cooldown:.0f} seconds")
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {name: health.snapshot() for name, health in self._health.items()}
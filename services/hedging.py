@@ -0,0 +1,188 @@
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, Generator, Iterable, Iterator, Optional, Tuple
+
+_CHUNK = "chunk"
+_DONE = "done"
+_ERROR = "error"
+
+
+class HedgeStats:
+    """
+    Counters for tuning the hedge budget: how often a hedge fires and who wins.
+
+    A hedge win is a win by the attempt launched because the budget ran out; a win
+    by an attempt launched to replace a failed one is a failover win.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.hedged = 0
+        self.primary_wins = 0
+        self.hedge_wins = 0
+        self.failover_wins = 0
+
+    def record(self, hedged: bool, winner: Optional[int], hedge: Optional[int] = None) -> None:
+        """Count one request; ``winner`` and ``hedge`` are attempt indexes (``hedge`` is the timeout-launched one)."""
+        with self._lock:
+            self.requests += 1
+            self.hedged += int(hedged)
+            if winner == 0:
+                self.primary_wins += 1
+            elif winner is not None and winner == hedge:
+                self.hedge_wins += 1
+            elif winner is not None:
+                self.failover_wins += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "hedged": self.hedged,
+                "hedge_rate": round(self.hedged / self.requests, 4) if self.requests else 0.0,
+                "primary_wins": self.primary_wins,
+                "hedge_wins": self.hedge_wins,
+                "failover_wins": self.failover_wins,
+                "hedge_win_rate": round(self.hedge_wins / self.hedged, 4) if self.hedged else 0.0,
+            }
+
+
+def _run_attempt(
+    attempt: int,
+    open_stream: Callable[[], Iterable[str]],
+    cancel: threading.Event,
+    out: queue.Queue,
+    streams: Dict[int, Iterable[str]],
+) -> None:
+    chunks = None
+    try:
+        stream = streams[attempt] = open_stream()
+        if cancel.is_set():
+            return  # Lost while the stream was opening
+        chunks = iter(stream)
+        for chunk in chunks:
+            if cancel.is_set():
+                return
+            out.put((attempt, _CHUNK, chunk))
+        out.put((attempt, _DONE, None))
+    except Exception as exc:
+        # A cancelled stream may raise from its transport; that is not a model failure
+        if not cancel.is_set():
+            out.put((attempt, _ERROR, exc))
+    finally:
+        # Release the response now instead of whenever the suspended generator is collected
+        close = getattr(chunks, "close", None)
+        if close is not None:
+            close()
+
+
+def _cancel_attempt(cancel: threading.Event, stream: Optional[Iterable[str]]) -> None:
+    cancel.set()
+    # The worker only sees the event between chunks; a stream with cancel() can be stopped mid-wait
+    stop = getattr(stream, "cancel", None)
+    if stop is not None:
+        try:
+            stop()
+        except Exception as exc:
+            print(f"⚠️  Cancelling a losing stream failed: {exc}")
+
+
+def hedged_stream(
+    attempts: Iterator[Tuple[str, Callable[[], Iterable[str]]]],
+    budget: float,
+    stats: HedgeStats,
+    on_first_chunk: Callable[[str, float], None] = lambda name, latency: None,
+    on_error: Callable[[str, BaseException], None] = lambda name, error: None,
+) -> Generator[str, None, Optional[BaseException]]:
+    """
+    Stream from the first attempt that produces output, hedging slow starts.
+
+    The first attempt starts immediately. If no chunk has arrived after ``budget``
+    seconds, the next attempt is started alongside it; whichever produces a chunk
+    first wins and every other attempt is cancelled. A failed attempt is replaced
+    by the next one straight away. At most one hedge is fired per request.
+
+    Cancelling sets the attempt's event, which its thread checks between chunks,
+    and calls ``cancel()`` on the opened stream if it has one, so a loser blocked
+    waiting on the network is stopped too.
+
+    Args:
+        attempts: Lazily produced (name, open_stream) pairs in preference order;
+            ``open_stream`` returns an iterable of text chunks, optionally with a
+            thread-safe ``cancel()``
+        budget: Seconds to wait for the first chunk before hedging
+        stats: Counters updated once per request
+        on_first_chunk: Called with the winner's name and time to first chunk
+        on_error: Called for every attempt that raised before it was cancelled
+
+    Returns:
+        None once an attempt has streamed to completion, else the error that ended
+        the winning attempt mid-stream or the last attempt to fail (as the
+        generator's return value)
+    """
+    out: queue.Queue = queue.Queue()
+    names, started_at, cancels = [], [], []
+    streams: Dict[int, Iterable[str]] = {}
+    last_error: Optional[BaseException] = None
+    winner: Optional[int] = None
+    hedge: Optional[int] = None
+    hedged = False
+
+    def launch() -> bool:
+        for name, open_stream in attempts:
+            cancel = threading.Event()
+            names.append(name)
+            started_at.append(time.monotonic())
+            cancels.append(cancel)
+            threading.Thread(target=_run_attempt, args=(len(names) - 1, open_stream, cancel, out, streams), daemon=True).start()
+            return True
+        return False
+
+    running = 1 if launch() else 0
+    try:
+        while running:
+            timeout = None
+            if winner is None and not hedged:
+                timeout = max(started_at[-1] + budget - time.monotonic(), 0.0)
+            try:
+                attempt, kind, payload = out.get(timeout=timeout)
+            except queue.Empty:
+                hedged = True
+                if launch():
+                    hedge = len(names) - 1
+                    running += 1
+                continue
+
+            # Only a chunk wins: an attempt that ends without output has not answered
+            if winner is None and kind == _CHUNK:
+                winner = attempt
+                on_first_chunk(names[attempt], time.monotonic() - started_at[attempt])
+                for other, cancel in enumerate(cancels):
+                    if other != attempt:
+                        _cancel_attempt(cancel, streams.get(other))
+            if attempt != winner:
+                if kind == _ERROR or (kind == _DONE and winner is None):
+                    error = payload if kind == _ERROR else LookupError(f"{names[attempt]} returned an empty response")
+                    on_error(names[attempt], error)
+                    last_error = error
+                    running -= 1
+                    if winner is None and not running:
+                        # Nothing left in flight: fail over to the next candidate now
+                        running += int(launch())
+                continue
+
+            if kind == _CHUNK:
+                yield payload
+            elif kind == _ERROR:
+                # Failed mid-stream: the output so far is cut off, so report it as a failure
+                on_error(names[attempt], payload)
+                return payload
+            else:
+                return None
+        return last_error or LookupError("no model was available to answer")
+    finally:
+        for attempt, cancel in enumerate(cancels):
+            _cancel_attempt(cancel, streams.get(attempt))
+        stats.record(hedged, winner, hedge)
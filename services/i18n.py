@@ -0,0 +1,276 @@
+"""
+Message catalogue for replies rendered locally in the user's language.
+
+Weather, market and profile-update replies are built from these templates and
+name dictionaries instead of being machine-translated after the fact. Anything
+not in the catalogue (district and market names, unknown commodities) is left
+as it came from the data source.
+"""
+from datetime import datetime
+from functools import lru_cache
+import re
+from typing import Dict
+
+# Languages offered in app.LANGUAGE_CHOICES
+SUPPORTED_LANGUAGES = ("en", "hi", "mr", "ta", "te")
+
+MESSAGES: Dict[str, Dict[str, str]] = {
+    "en": {
+        "weather_no_location": "I do not know your location yet. Please update it first.",
+        "weather_report": "The weather in {location} is {temp}°C with {description}.",
+        "weather_no_details": "I could not retrieve detailed weather data for {location}.",
+        "weather_unavailable": "Weather data for {location} is currently unavailable. Please try again later.",
+        "market_title_location": "Market prices for {location}:",
+        "market_title": "Market prices:",
+        "market_location": "Location",
+        "market_price_range": "Price Range",
+        "market_modal_price": "Modal Price",
+        "market_no_data": "No market price data available for {location}.",
+        "market_no_data_region": "No market price data available for your region.",
+        "market_fetch_failed": "Unable to fetch market prices for {location} at the moment. Please try again later.",
+        "market_last_updated": "Last updated: {date}",
+        "market_tip": "Tip: Prices vary by market. Visit your local mandi for exact rates.",
+        "market_error": "Error fetching market prices for {location}. The service may be temporarily unavailable.",
+        "commodity_no_data": "No price data found for {commodity}.",
+        "commodity_error": "Error searching for {commodity} prices.",
+        "location_updated": "Your location has been updated to {location}.",
+        "location_missing": "I could not detect the new location. Please try again.",
+        "crops_updated": "Your crops have been updated to {crops}.",
+        "crops_missing": "I could not detect the new crops list. Please try again.",
+        "crops_none": "none",
+    },
+    "hi": {
+        "weather_no_location": "मुझे अभी आपका स्थान पता नहीं है। कृपया पहले इसे अपडेट करें।",
+        "weather_report": "{location} में मौसम {temp}°C है, {description}।",
+        "weather_no_details": "{location} के लिए विस्तृत मौसम जानकारी नहीं मिल सकी।",
+        "weather_unavailable": "{location} के लिए मौसम जानकारी अभी उपलब्ध नहीं है। कृपया बाद में फिर प्रयास करें।",
+        "market_title_location": "{location} के बाज़ार भाव:",
+        "market_title": "बाज़ार भाव:",
+        "market_location": "स्थान",
+        "market_price_range": "मूल्य सीमा",
+        "market_modal_price": "मॉडल मूल्य",
+        "market_no_data": "{location} के लिए बाज़ार भाव उपलब्ध नहीं हैं।",
+        "market_no_data_region": "आपके क्षेत्र के लिए बाज़ार भाव उपलब्ध नहीं हैं।",
+        "market_fetch_failed": "अभी {location} के बाज़ार भाव प्राप्त नहीं हो सके। कृपया बाद में फिर प्रयास करें।",
+        "market_last_updated": "अंतिम अपडेट: {date}",
+        "market_tip": "सुझाव: भाव हर मंडी में अलग होते हैं। सटीक दरों के लिए अपनी स्थानीय मंडी जाएँ।",
+        "market_error": "{location} के बाज़ार भाव प्राप्त करने में त्रुटि हुई। सेवा अस्थायी रूप से उपलब्ध नहीं हो सकती।",
+        "commodity_no_data": "{commodity} के लिए कोई भाव नहीं मिला।",
+        "commodity_error": "{commodity} के भाव खोजने में त्रुटि हुई।",
+        "location_updated": "आपका स्थान {location} पर अपडेट कर दिया गया है।",
+        "location_missing": "नया स्थान पहचाना नहीं जा सका। कृपया फिर प्रयास करें।",
+        "crops_updated": "आपकी फसलें {crops} पर अपडेट कर दी गई हैं।",
+        "crops_missing": "नई फसलों की सूची पहचानी नहीं जा सकी। कृपया फिर प्रयास करें।",
+        "crops_none": "कोई नहीं",
+    },
+    "mr": {
+        "weather_no_location": "मला अजून तुमचे ठिकाण माहीत नाही. कृपया आधी ते अपडेट करा.",
+        "weather_report": "{location} येथे हवामान {temp}°C असून {description} आहे.",
+        "weather_no_details": "{location} साठी सविस्तर हवामान माहिती मिळू शकली नाही.",
+        "weather_unavailable": "{location} साठी हवामान माहिती सध्या उपलब्ध नाही. कृपया नंतर पुन्हा प्रयत्न करा.",
+        "market_title_location": "{location} येथील बाजारभाव:",
+        "market_title": "बाजारभाव:",
+        "market_location": "ठिकाण",
+        "market_price_range": "दर श्रेणी",
+        "market_modal_price": "सर्वसाधारण दर",
+        "market_no_data": "{location} साठी बाजारभाव उपलब्ध नाहीत.",
+        "market_no_data_region": "तुमच्या भागासाठी बाजारभाव उपलब्ध नाहीत.",
+        "market_fetch_failed": "सध्या {location} चे बाजारभाव मिळू शकले नाहीत. कृपया नंतर पुन्हा प्रयत्न करा.",
+        "market_last_updated": "शेवटचे अपडेट: {date}",
+        "market_tip": "टीप: दर प्रत्येक बाजारात वेगवेगळे असतात. अचूक दरांसाठी तुमच्या जवळच्या मंडईला भेट द्या.",
+        "market_error": "{location} चे बाजारभाव मिळवताना त्रुटी आली. सेवा तात्पुरती अनुपलब्ध असू शकते.",
+        "commodity_no_data": "{commodity} साठी कोणतेही दर सापडले नाहीत.",
+        "commodity_error": "{commodity} चे दर शोधताना त्रुटी आली.",
+        "location_updated": "तुमचे ठिकाण {location} असे अपडेट केले आहे.",
+        "location_missing": "नवीन ठिकाण ओळखता आले नाही. कृपया पुन्हा प्रयत्न करा.",
+        "crops_updated": "तुमची पिके {crops} अशी अपडेट केली आहेत.",
+        "crops_missing": "नवीन पिकांची यादी ओळखता आली नाही. कृपया पुन्हा प्रयत्न करा.",
+        "crops_none": "काहीही नाही",
+    },
+    "ta": {
+        "weather_no_location": "உங்கள் இருப்பிடம் இன்னும் எனக்குத் தெரியவில்லை. முதலில் அதைப் புதுப்பிக்கவும்.",
+        "weather_report": "{location} இல் வானிலை {temp}°C, {description}.",
+        "weather_no_details": "{location} க்கான விரிவான வானிலை தகவலைப் பெற முடியவில்லை.",
+        "weather_unavailable": "{location} க்கான வானிலை தகவல் தற்போது கிடைக்கவில்லை. பின்னர் மீண்டும் முயற்சிக்கவும்.",
+        "market_title_location": "{location} சந்தை விலைகள்:",
+        "market_title": "சந்தை விலைகள்:",
+        "market_location": "இடம்",
+        "market_price_range": "விலை வரம்பு",
+        "market_modal_price": "பொது விலை",
+        "market_no_data": "{location} க்கான சந்தை விலை தகவல் இல்லை.",
+        "market_no_data_region": "உங்கள் பகுதிக்கான சந்தை விலை தகவல் இல்லை.",
+        "market_fetch_failed": "தற்போது {location} சந்தை விலைகளைப் பெற முடியவில்லை. பின்னர் மீண்டும் முயற்சிக்கவும்.",
+        "market_last_updated": "கடைசியாகப் புதுப்பிக்கப்பட்டது: {date}",
+        "market_tip": "குறிப்பு: விலைகள் சந்தைக்குச் சந்தை மாறுபடும். சரியான விலைக்கு உங்கள் உள்ளூர் மண்டியை அணுகவும்.",
+        "market_error": "{location} சந்தை விலைகளைப் பெறுவதில் பிழை. சேவை தற்காலிகமாகக் கிடைக்காமல் இருக்கலாம்.",
+        "commodity_no_data": "{commodity} க்கான விலை தகவல் கிடைக்கவில்லை.",
+        "commodity_error": "{commodity} விலைகளைத் தேடுவதில் பிழை.",
+        "location_updated": "உங்கள் இருப்பிடம் {location} என புதுப்பிக்கப்பட்டது.",
+        "location_missing": "புதிய இருப்பிடத்தைக் கண்டறிய முடியவில்லை. மீண்டும் முயற்சிக்கவும்.",
+        "crops_updated": "உங்கள் பயிர்கள் {crops} என புதுப்பிக்கப்பட்டன.",
+        "crops_missing": "புதிய பயிர் பட்டியலைக் கண்டறிய முடியவில்லை. மீண்டும் முயற்சிக்கவும்.",
+        "crops_none": "எதுவும் இல்லை",
+    },
+    "te": {
+        "weather_no_location": "మీ ప్రాంతం నాకు ఇంకా తెలియదు. దయచేసి ముందుగా దాన్ని అప్‌డేట్ చేయండి.",
+        "weather_report": "{location}లో వాతావరణం {temp}°C, {description}.",
+        "weather_no_details": "{location} కోసం వివరమైన వాతావరణ సమాచారం పొందలేకపోయాము.",
+        "weather_unavailable": "{location} కోసం వాతావరణ సమాచారం ప్రస్తుతం అందుబాటులో లేదు. దయచేసి తర్వాత మళ్ళీ ప్రయత్నించండి.",
+        "market_title_location": "{location} మార్కెట్ ధరలు:",
+        "market_title": "మార్కెట్ ధరలు:",
+        "market_location": "ప్రాంతం",
+        "market_price_range": "ధర పరిధి",
+        "market_modal_price": "సాధారణ ధర",
+        "market_no_data": "{location} కోసం మార్కెట్ ధరల సమాచారం లేదు.",
+        "market_no_data_region": "మీ ప్రాంతానికి మార్కెట్ ధరల సమాచారం లేదు.",
+        "market_fetch_failed": "ప్రస్తుతం {location} మార్కెట్ ధరలు పొందలేకపోయాము. దయచేసి తర్వాత మళ్ళీ ప్రయత్నించండి.",
+        "market_last_updated": "చివరి అప్‌డేట్: {date}",
+        "market_tip": "సూచన: ధరలు మార్కెట్‌ను బట్టి మారుతాయి. ఖచ్చితమైన ధరల కోసం మీ స్థానిక మండీని సందర్శించండి.",
+        "market_error": "{location} మార్కెట్ ధరలు పొందడంలో లోపం. సేవ తాత్కాలికంగా అందుబాటులో లేకపోవచ్చు.",
+        "commodity_no_data": "{commodity} కోసం ధరల సమాచారం దొరకలేదు.",
+        "commodity_error": "{commodity} ధరలు వెతకడంలో లోపం.",
+        "location_updated": "మీ ప్రాంతం {location}గా అప్‌డేట్ చేయబడింది.",
+        "location_missing": "కొత్త ప్రాంతాన్ని గుర్తించలేకపోయాము. దయచేసి మళ్ళీ ప్రయత్నించండి.",
+        "crops_updated": "మీ పంటలు {crops}గా అప్‌డేట్ చేయబడ్డాయి.",
+        "crops_missing": "కొత్త పంటల జాబితాను గుర్తించలేకపోయాము. దయచేసి మళ్ళీ ప్రయత్నించండి.",
+        "crops_none": "ఏవీ లేవు",
+    },
+}
+
+# English name -> (hi, mr, ta, te)
+COMMODITY_NAMES = {
+    "onion": ("प्याज", "कांदा", "வெங்காயம்", "ఉల్లిపాయ"),
+    "tomato": ("टमाटर", "टोमॅटो", "தக்காளி", "టమాటా"),
+    "potato": ("आलू", "बटाटा", "உருளைக்கிழங்கு", "బంగాళాదుంప"),
+    "wheat": ("गेहूं", "गहू", "கோதுமை", "గోధుమ"),
+    "rice": ("चावल", "तांदूळ", "அரிசி", "బియ్యం"),
+    "paddy": ("धान", "भात", "நெல்", "వరి"),
+    "cotton": ("कपास", "कापूस", "பருத்தி", "పత్తి"),
+    "soyabean": ("सोयाबीन", "सोयाबीन", "சோயாபீன்", "సోయాబీన్"),
+    "soybean": ("सोयाबीन", "सोयाबीन", "சோயாபீன்", "సోయాబీన్"),
+    "maize": ("मक्का", "मका", "மக்காச்சோளம்", "మొక్కజొన్న"),
+    "banana": ("केला", "केळी", "வாழைப்பழம்", "అరటి"),
+    "green chilli": ("हरी मिर्च", "हिरवी मिरची", "பச்சை மிளகாய்", "పచ్చి మిరపకాయ"),
+    "brinjal": ("बैंगन", "वांगी", "கத்தரிக்காய்", "వంకాయ"),
+    "cabbage": ("पत्ता गोभी", "कोबी", "முட்டைக்கோஸ்", "క్యాబేజీ"),
+    "cauliflower": ("फूलगोभी", "फुलकोबी", "காலிஃபிளவர்", "కాలీఫ్లవర్"),
+    "garlic": ("लहसुन", "लसूण", "பூண்டு", "వెల్లుల్లి"),
+    "ginger": ("अदरक", "आले", "இஞ்சி", "అల్లం"),
+    "groundnut": ("मूंगफली", "भुईमूग", "நிலக்கடலை", "వేరుశనగ"),
+    "mustard": ("सरसों", "मोहरी", "கடுகு", "ఆవాలు"),
+    "bajra": ("बाजरा", "बाजरी", "கம்பு", "సజ్జలు"),
+    "jowar": ("ज्वार", "ज्वारी", "சோளம்", "జొన్నలు"),
+    "sugarcane": ("गन्ना", "ऊस", "கரும்பு", "చెరకు"),
+    "turmeric": ("हल्दी", "हळद", "மஞ்சள்", "పసుపు"),
+    "apple": ("सेब", "सफरचंद", "ஆப்பிள்", "ఆపిల్"),
+    "mango": ("आम", "आंबा", "மாம்பழம்", "మామిడి"),
+    "grapes": ("अंगूर", "द्राक्षे", "திராட்சை", "ద్రాక్ష"),
+    "lemon": ("नींबू", "लिंबू", "எலுமிச்சை", "నిమ్మకాయ"),
+    "carrot": ("गाजर", "गाजर", "கேரட்", "క్యారెట్"),
+    "bhindi": ("भिंडी", "भेंडी", "வெண்டைக்காய்", "బెండకాయ"),
+    "ladies finger": ("भिंडी", "भेंडी", "வெண்டைக்காய்", "బెండకాయ"),
+    "arhar": ("अरहर", "तूर", "துவரை", "కందులు"),
+    "tur": ("अरहर", "तूर", "துவரை", "కందులు"),
+    "bengal gram": ("चना", "हरभरा", "கொண்டைக்கடலை", "శనగలు"),
+    "gram": ("चना", "हरभरा", "கொண்டைக்கடலை", "శనగలు"),
+    "coconut": ("नारियल", "नारळ", "தேங்காய்", "కొబ్బరి"),
+    "pomegranate": ("अनार", "डाळिंब", "மாதுளை", "దానిమ్మ"),
+    "peas": ("मटर", "वाटाणा", "பட்டாணி", "బఠానీ"),
+}
+
+VARIETY_NAMES = {
+    "other": ("अन्य", "इतर", "மற்றவை", "ఇతర"),
+    "local": ("स्थानीय", "स्थानिक", "உள்ளூர்", "స్థానిక"),
+    "hybrid": ("संकर", "संकरित", "கலப்பினம்", "హైబ్రిడ్"),
+}
+
+STATE_NAMES = {
+    "andhra pradesh": ("आंध्र प्रदेश", "आंध्र प्रदेश", "ஆந்திரப் பிரதேசம்", "ఆంధ్ర ప్రదేశ్"),
+    "assam": ("असम", "आसाम", "அசாம்", "అస్సాం"),
+    "bihar": ("बिहार", "बिहार", "பீகார்", "బీహార్"),
+    "chandigarh": ("चंडीगढ़", "चंदीगड", "சண்டிகர்", "చండీగఢ్"),
+    "chhattisgarh": ("छत्तीसगढ़", "छत्तीसगड", "சத்தீஸ்கர்", "ఛత్తీస్‌గఢ్"),
+    "delhi": ("दिल्ली", "दिल्ली", "டெல்லி", "ఢిల్లీ"),
+    "goa": ("गोवा", "गोवा", "கோவா", "గోవా"),
+    "gujarat": ("गुजरात", "गुजरात", "குஜராத்", "గుజరాత్"),
+    "haryana": ("हरियाणा", "हरियाणा", "ஹரியானா", "హర్యానా"),
+    "himachal pradesh": ("हिमाचल प्रदेश", "हिमाचल प्रदेश", "இமாச்சலப் பிரதேசம்", "హిమాచల్ ప్రదేశ్"),
+    "india": ("भारत", "भारत", "இந்தியா", "భారతదేశం"),
+    "jammu and kashmir": ("जम्मू और कश्मीर", "जम्मू आणि काश्मीर", "ஜம்மு காஷ்மீர்", "జమ్మూ కాశ్మీర్"),
+    "jharkhand": ("झारखंड", "झारखंड", "ஜார்கண்ட்", "జార్ఖండ్"),
+    "karnataka": ("कर्नाटक", "कर्नाटक", "கர்நாடகா", "కర్ణాటక"),
+    "kerala": ("केरल", "केरळ", "கேரளா", "కేరళ"),
+    "madhya pradesh": ("मध्य प्रदेश", "मध्य प्रदेश", "மத்தியப் பிரதேசம்", "మధ్య ప్రదేశ్"),
+    "maharashtra": ("महाराष्ट्र", "महाराष्ट्र", "மகாராஷ்டிரா", "మహారాష్ట్ర"),
+    "odisha": ("ओडिशा", "ओडिशा", "ஒடிசா", "ఒడిశా"),
+    "punjab": ("पंजाब", "पंजाब", "பஞ்சாப்", "పంజాబ్"),
+    "rajasthan": ("राजस्थान", "राजस्थान", "ராஜஸ்தான்", "రాజస్థాన్"),
+    "tamil nadu": ("तमिलनाडु", "तमिळनाडू", "தமிழ்நாடு", "తమిళనాడు"),
+    "telangana": ("तेलंगाना", "तेलंगणा", "தெலங்கானா", "తెలంగాణ"),
+    "uttar pradesh": ("उत्तर प्रदेश", "उत्तर प्रदेश", "உத்தரப் பிரதேசம்", "ఉత్తర ప్రదేశ్"),
+    "uttarakhand": ("उत्तराखंड", "उत्तराखंड", "உத்தராகண்ட்", "ఉత్తరాఖండ్"),
+    "west bengal": ("पश्चिम बंगाल", "पश्चिम बंगाल", "மேற்கு வங்காளம்", "పశ్చిమ బెంగాల్"),
+}
+
+# OpenWeather condition descriptions
+WEATHER_DESCRIPTIONS = {
+    "clear sky": ("साफ आसमान", "निरभ्र आकाश", "தெளிவான வானம்", "నిర్మలమైన ఆకాశం"),
+    "few clouds": ("हल्के बादल", "थोडे ढग", "சில மேகங்கள்", "కొన్ని మేఘాలు"),
+    "scattered clouds": ("छितरे बादल", "विखुरलेले ढग", "சிதறிய மேகங்கள்", "చెదురుమదురు మేఘాలు"),
+    "broken clouds": ("आंशिक बादल", "अंशतः ढगाळ", "பகுதி மேகமூட்டம்", "పాక్షిక మేఘావృతం"),
+    "overcast clouds": ("घने बादल", "ढगाळ आकाश", "முழு மேகமூட்டம்", "దట్టమైన మేఘాలు"),
+    "light rain": ("हल्की बारिश", "हलका पाऊस", "லேசான மழை", "తేలికపాటి వర్షం"),
+    "moderate rain": ("मध्यम बारिश", "मध्यम पाऊस", "மிதமான மழை", "మోస్తరు వర్షం"),
+    "heavy intensity rain": ("भारी बारिश", "मुसळधार पाऊस", "கனமழை", "భారీ వర్షం"),
+    "shower rain": ("बौछारें", "सरी", "சாரல் மழை", "జల్లులు"),
+    "rain": ("बारिश", "पाऊस", "மழை", "వర్షం"),
+    "thunderstorm": ("आंधी-तूफान", "वादळी पाऊस", "இடியுடன் கூடிய மழை", "ఉరుములతో కూడిన వర్షం"),
+    "drizzle": ("बूंदाबांदी", "रिमझिम पाऊस", "தூறல்", "చినుకులు"),
+    "light intensity drizzle": ("बूंदाबांदी", "रिमझिम पाऊस", "தூறல்", "చినుకులు"),
+    "mist": ("धुंध", "धुके", "மூடுபனி", "పొగమంచు"),
+    "haze": ("धुंधलापन", "धूसर वातावरण", "மங்கலான வானம்", "మసక వాతావరణం"),
+    "fog": ("कोहरा", "दाट धुके", "பனிமூட்டம்", "దట్టమైన పొగమంచు"),
+    "smoke": ("धुआं", "धूर", "புகை", "పొగ"),
+    "dust": ("धूल", "धूळ", "தூசி", "దుమ్ము"),
+    "snow": ("बर्फबारी", "हिमवृष्टी", "பனிப்பொழிவு", "మంచు"),
+}
+
+_NAME_LANGUAGES = ("hi", "mr", "ta", "te")
+_NAMES: Dict[str, tuple] = {**COMMODITY_NAMES, **VARIETY_NAMES, **STATE_NAMES, **WEATHER_DESCRIPTIONS}
+
+
+def is_supported_language(language: str) -> bool:
+    return language in SUPPORTED_LANGUAGES
+
+
+def t(key: str, language: str = "en", **values) -> str:
+    """Render a catalogue message in ``language``, falling back to English."""
+    template = MESSAGES.get(language, MESSAGES["en"]).get(key) or MESSAGES["en"][key]
+    return template.format(**values)
+
+
+@lru_cache(maxsize=4096)
+def localize_name(name: str, language: str = "en") -> str:
+    """
+    Commodity, variety, state or weather-condition name in ``language``.
+
+    Data.gov.in qualifiers are tolerated ("Paddy(Dhan)(Common)" matches "paddy");
+    unknown names are returned unchanged.
+    """
+    if not name or language not in _NAME_LANGUAGES:
+        return name
+    key = " ".join(name.lower().split())
+    names = _NAMES.get(key) or _NAMES.get(re.sub(r"\s*\(.*?\)", "", key).strip())
+    if names is None:
+        return name
+    return names[_NAME_LANGUAGES.index(language)]
+
+
+def localize_place(location: str, language: str = "en") -> str:
+    """Localize each comma-separated part of a place ("Pune, Maharashtra")."""
+    return ", ".join(localize_name(part.strip(), language) for part in location.split(","))
+
+
+def format_date(value: datetime, language: str = "en") -> str:
+    # Month names would need their own catalogue; other languages get a numeric date
+    return value.strftime("%B %d, %Y") if language == "en" else value.strftime("%d/%m/%Y")
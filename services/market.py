@@ -1,11 +1,26 @@
+import os
+
+import numpy as np
 import requests
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 from datetime import datetime
 
+from .i18n import format_date, localize_name, localize_place, t
+from .market_bulk import bulk_download
+from .market_columns import MarketColumns
+from .market_snapshot import MarketSnapshotStore
 
 # Data.gov.in API configuration
-MARKET_API_URL = "https://api.data.gov.in/resource/9ef84268-d588-465a-a308-a864a43d0070"
-API_KEY = "579b464db66ec23bdd00000122bf35ef5cef4bb5405747991b0b1ede"
+MARKET_API_URL = os.getenv("MARKET_API_URL", "https://api.data.gov.in/resource/9ef84268-d588-465a-a308-a864a43d0070")
+API_KEY = os.getenv("MARKET_API_KEY", "579b464db66ec23bdd00000122bf35ef5cef4bb5405747991b0b1ede")
+
+# Market reads are served from an in-memory, indexed snapshot of the dataset that a
+# background thread refreshes every MARKET_SNAPSHOT_INTERVAL seconds. MARKET_SNAPSHOT=0
+# goes back to downloading and filtering on every call.
+MARKET_SNAPSHOT_ENABLED = os.getenv("MARKET_SNAPSHOT", "1") != "0"
+MARKET_SNAPSHOT_INTERVAL = float(os.getenv("MARKET_SNAPSHOT_INTERVAL", "900"))
+# Cap on the records loaded into the snapshot; 0 loads the full dataset
+MARKET_SNAPSHOT_RECORDS = int(os.getenv("MARKET_SNAPSHOT_RECORDS", "0"))
 
 # Common city to district/state mappings for better location matching
 CITY_DISTRICT_MAP = {
@@ -71,33 +86,70 @@ def parse_location(location: str) -> Dict[str, Optional[str]]:
     return {"district": location, "state": None}
 
 
+def _download_market_data(limit: int, timeout: float = 10) -> Dict:
+    """Download the first ``limit`` records of the data.gov.in dataset (raises on HTTP errors)."""
+    params = {
+        "api-key": API_KEY,
+        "format": "json",
+        "offset": 0,
+        "limit": limit
+    }
+    response = requests.get(MARKET_API_URL, params=params, timeout=timeout)
+    response.raise_for_status()
+    return response.json()
+
+
+def _load_full_dataset() -> Dict:
+    # Every page of the dataset, fetched concurrently (the snapshot is no longer cut at one page)
+    return bulk_download(MARKET_API_URL, API_KEY, max_records=MARKET_SNAPSHOT_RECORDS or None)
+
+
+_SNAPSHOT = MarketSnapshotStore(_load_full_dataset, interval=MARKET_SNAPSHOT_INTERVAL)
+
+
+def warm_market_snapshot() -> bool:
+    """Start the scheduled refresh and wait for its first load."""
+    _SNAPSHOT.start()
+    return _SNAPSHOT.load_initial() is not None
+
+
+def is_market_snapshot_ready() -> bool:
+    return _SNAPSHOT.snapshot is not None
+
+
+def get_market_snapshot_stats() -> Dict:
+    return _SNAPSHOT.stats()
+
+
 def fetch_market_data(state: Optional[str] = None, district: Optional[str] = None, commodity: Optional[str] = None, limit: int = 100) -> Dict:
     """
-    Fetch market price data from data.gov.in API.
+    Fetch market price data, from the in-memory snapshot when enabled.
     
     Args:
         state: Filter by state name (optional)
         district: Filter by district name (optional)
         commodity: Filter by commodity name (optional)
-        limit: Maximum number of records to fetch
+        limit: Maximum number of records to return (to download, when no snapshot is loaded)
     
     Returns:
-        Dictionary containing market data with records, updated date, and description
+        Dictionary containing market data with records, updated date, and description;
+        snapshot reads also carry its age under 'snapshot'
     """
-    params = {
-        "api-key": API_KEY,
-        "format": "json",
-        "offset": 0,
-        "limit": limit
-    }
-    
+    snapshot = _SNAPSHOT.ensure() if MARKET_SNAPSHOT_ENABLED else None
+    if snapshot is not None:
+        return {
+            "records": snapshot.query(state=state, district=district, commodity=commodity, limit=limit),
+            "updated_date": snapshot.updated_date,
+            "desc": snapshot.desc,
+            "snapshot": _SNAPSHOT.staleness(),
+        }
+
+    # No snapshot (disabled, or its load failed): download this call's records.
     # The API doesn't support server-side filtering via filters parameter
     # We'll fetch data and filter client-side
     
     try:
-        response = requests.get(MARKET_API_URL, params=params, timeout=10)
-        response.raise_for_status()
-        data = response.json()
+        data = _download_market_data(limit)
         
         # Client-side filtering
         if data and "records" in data:
@@ -133,7 +185,34 @@ def fetch_market_data(state: Optional[str] = None, district: Optional[str] = Non
         return {"records": [], "updated_date": None, "desc": "Unable to fetch market data"}
 
 
-def format_market_prices(records: List[Dict], location: str = "", district: str = "", state: str = "", top_n: int = 10) -> str:
+def get_market_filter_options(state: Optional[str] = None, district: Optional[str] = None) -> Dict[str, List[str]]:
+    """
+    Distinct states, districts and commodities for the market dropdowns.
+    
+    Args:
+        state: Narrow districts and commodities to this state (optional)
+        district: Narrow commodities to this district (optional)
+    
+    Returns:
+        Dictionary with sorted 'states', 'districts' and 'commodities' lists
+    """
+    snapshot = _SNAPSHOT.ensure() if MARKET_SNAPSHOT_ENABLED else None
+    if snapshot is not None:
+        return {
+            "states": snapshot.values("state", state=state, district=district),
+            "districts": snapshot.values("district", state=state, district=district),
+            "commodities": snapshot.values("commodity", state=state, district=district),
+        }
+
+    records = fetch_market_data(state=state, district=district, limit=4000).get("records", [])
+    return {
+        "states": sorted(set(r.get("state", "") for r in records if r.get("state"))),
+        "districts": sorted(set(r.get("district", "") for r in records if r.get("district"))),
+        "commodities": sorted(set(r.get("commodity", "") for r in records if r.get("commodity"))),
+    }
+
+
+def format_market_prices(records: List[Dict], location: str = "", district: str = "", state: str = "", top_n: int = 10, language: str = "en") -> str:
     """
     Format market price records into a readable text response.
     
@@ -143,51 +222,56 @@ def format_market_prices(records: List[Dict], location: str = "", district: str
         district: District name for filtering (already filtered from API)
         state: State name for filtering (already filtered from API)
         top_n: Number of top results to show
+        language: Language code to render the labels and names in
     
     Returns:
         Formatted string with market prices
     """
     if not records:
-        return f"No market price data available for {location or 'your region'}."
+        if not location:
+            return t("market_no_data_region", language)
+        return t("market_no_data", language, location=localize_place(location, language))
     
     # Records are already filtered by API, just take top N
     filtered_records = records[:top_n]
     
     if location:
-        result = f"Market prices for {location}:\n\n"
+        result = t("market_title_location", language, location=localize_place(location, language)) + "\n\n"
     else:
-        result = "Market prices:\n\n"
+        result = t("market_title", language) + "\n\n"
     
     # Format each record
     for i, record in enumerate(filtered_records, 1):
-        state_name = record.get("state", "N/A")
+        state_name = localize_name(record.get("state", "N/A"), language)
         district_name = record.get("district", "N/A")
         market = record.get("market", "N/A")
-        commodity = record.get("commodity", "N/A")
-        variety = record.get("variety", "N/A")
+        commodity = localize_name(record.get("commodity", "N/A"), language)
+        variety = localize_name(record.get("variety", "N/A"), language)
         min_price = record.get("min_price", "N/A")
         max_price = record.get("max_price", "N/A")
         modal_price = record.get("modal_price", "N/A")
         
         result += f"{i}. **{commodity}** ({variety})\n"
-        result += f"   📍 Location: {market}, {district_name}, {state_name}\n"
-        result += f"   💰 Price Range: ₹{min_price} - ₹{max_price}\n"
-        result += f"   📊 Modal Price: ₹{modal_price}\n\n"
+        result += f"   📍 {t('market_location', language)}: {market}, {district_name}, {state_name}\n"
+        result += f"   💰 {t('market_price_range', language)}: ₹{min_price} - ₹{max_price}\n"
+        result += f"   📊 {t('market_modal_price', language)}: ₹{modal_price}\n\n"
     
     return result.strip()
 
 
-def get_market_prices(location: str) -> str:
+def get_market_prices(location: str, language: str = "en") -> str:
     """
     Get current market prices for commodities based on user's location.
     
     Args:
         location: User's location (city name)
+        language: Language code to render the reply in
     
     Returns:
         Formatted string with market price information
     """
     location_text = location or "India"
+    place = localize_place(location_text, language)
     
     try:
         # Parse location to get district and state
@@ -217,13 +301,13 @@ def get_market_prices(location: str) -> str:
             print(f"⚠️ Using general market data, {len(data.get('records', []))} records")
         
         if not data or "records" not in data:
-            return f"Unable to fetch market prices for {location_text} at the moment. Please try again later."
+            return t("market_fetch_failed", language, location=place)
         
         records = data.get("records", [])
         updated_date = data.get("updated_date")
         
         if not records:
-            return f"No market price data available for {location_text}."
+            return t("market_no_data", language, location=place)
         
         # Format the response with location-specific filtering
         response = format_market_prices(
@@ -231,33 +315,35 @@ def get_market_prices(location: str) -> str:
             location=location_text,
             district=district or "",
             state=state or "",
-            top_n=8
+            top_n=8,
+            language=language
         )
         
         # Add update information
         if updated_date:
             try:
                 update_dt = datetime.fromisoformat(updated_date.replace("Z", "+00:00"))
-                response += f"\n\n📅 Last updated: {update_dt.strftime('%B %d, %Y')}"
+                response += f"\n\n📅 {t('market_last_updated', language, date=format_date(update_dt, language))}"
             except:
                 pass
         
-        response += "\n\n💡 Tip: Prices vary by market. Visit your local mandi for exact rates."
+        response += f"\n\n💡 {t('market_tip', language)}"
         
         return response
         
     except Exception as e:
         print(f"Error in get_market_prices: {e}")
-        return f"Error fetching market prices for {location_text}. The service may be temporarily unavailable."
+        return t("market_error", language, location=place)
 
 
-def search_commodity_prices(commodity: str, location: Optional[str] = None) -> str:
+def search_commodity_prices(commodity: str, location: Optional[str] = None, language: str = "en") -> str:
     """
     Search for specific commodity prices.
     
     Args:
         commodity: Name of the commodity (e.g., "Tomato", "Rice", "Wheat")
         location: Optional location filter (city name)
+        language: Language code to render the reply in
     
     Returns:
         Formatted string with commodity-specific prices
@@ -288,19 +374,29 @@ def search_commodity_prices(commodity: str, location: Optional[str] = None) -> s
             records = data.get("records", [])
         
         if not records:
-            return f"No price data found for {commodity}."
+            return t("commodity_no_data", language, commodity=localize_name(commodity, language))
         
         return format_market_prices(
             records, 
             location=location or commodity,
             district=district or "",
             state=state or "",
-            top_n=10
+            top_n=10,
+            language=language
         )
         
     except Exception as e:
         print(f"Error searching commodity prices: {e}")
-        return f"Error searching for {commodity} prices."
+        return t("commodity_error", language, commodity=localize_name(commodity, language))
+
+
+def _market_columns(state: Optional[str] = None) -> Tuple[MarketColumns, Optional[np.ndarray]]:
+    """Columnar market records and the row mask for ``state``."""
+    snapshot = _SNAPSHOT.ensure() if MARKET_SNAPSHOT_ENABLED else None
+    if snapshot is not None:
+        return snapshot.columns, snapshot.columns.mask(state=state)
+    columns = MarketColumns(fetch_market_data(state=state, limit=150).get("records", []))
+    return columns, None
 
 
 def get_state_market_summary(state: str) -> str:
@@ -314,32 +410,15 @@ def get_state_market_summary(state: str) -> str:
         Formatted summary of market prices in that state
     """
     try:
-        data = fetch_market_data(state=state, limit=150)
-        records = data.get("records", [])
+        columns, mask = _market_columns(state)
         
-        if not records:
+        if not len(columns) or (mask is not None and not mask.any()):
             return f"No market data available for {state}."
         
-        # Group by commodity and get average modal prices
-        commodity_prices = {}
-        for record in records:
-            commodity = record.get("commodity", "Unknown")
-            modal_price = record.get("modal_price")
-            
-            if modal_price and modal_price != "NR":
-                try:
-                    price = float(modal_price)
-                    if commodity not in commodity_prices:
-                        commodity_prices[commodity] = []
-                    commodity_prices[commodity].append(price)
-                except:
-                    pass
-        
-        # Calculate averages
+        # Average modal price per commodity, over the records that report one
         result = f"Market Summary for {state}:\n\n"
-        for commodity, prices in sorted(commodity_prices.items()):
-            avg_price = sum(prices) / len(prices)
-            result += f"• {commodity}: ₹{avg_price:.2f} (avg from {len(prices)} markets)\n"
+        for group in columns.group_stats(by="commodity", price="modal_price", mask=mask):
+            result += f"• {group['name']}: ₹{group['avg']:.2f} (avg from {group['count']} markets)\n"
         
         return result
         
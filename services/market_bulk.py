@@ -0,0 +1,125 @@
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Dict, List, Optional
+
+import requests
+
+# Records per request; data.gov.in serves at most a few thousand per page
+MARKET_BULK_PAGE_SIZE = int(os.getenv("MARKET_BULK_PAGE_SIZE", "1000"))
+# Concurrent page requests; keep this modest, the API rate-limits per key
+MARKET_BULK_WORKERS = int(os.getenv("MARKET_BULK_WORKERS", "8"))
+MARKET_BULK_RETRIES = int(os.getenv("MARKET_BULK_RETRIES", "3"))
+MARKET_BULK_BACKOFF = float(os.getenv("MARKET_BULK_BACKOFF", "0.5"))
+
+_SESSIONS = threading.local()
+
+
+def _session() -> requests.Session:
+    # One keep-alive session per worker thread
+    session = getattr(_SESSIONS, "session", None)
+    if session is None:
+        session = _SESSIONS.session = requests.Session()
+    return session
+
+
+def fetch_page(
+    url: str,
+    api_key: str,
+    offset: int,
+    limit: int,
+    retries: int = MARKET_BULK_RETRIES,
+    backoff: float = MARKET_BULK_BACKOFF,
+    timeout: float = 30,
+) -> Dict[str, Any]:
+    """
+    Fetch one page of the data.gov.in dataset, retrying with exponential backoff.
+
+    Args:
+        url: Resource URL
+        api_key: data.gov.in API key
+        offset: Index of the first record
+        limit: Records per page
+        retries: Extra attempts after the first failure
+        backoff: Base delay in seconds, doubled per attempt (with jitter)
+        timeout: Per-request timeout in seconds
+
+    Returns:
+        The decoded JSON page (raises the last error once retries are exhausted)
+    """
+    params = {"api-key": api_key, "format": "json", "offset": offset, "limit": limit}
+
+    def attempt() -> Dict[str, Any]:
+        response = _session().get(url, params=params, timeout=timeout)
+        response.raise_for_status()
+        return response.json()
+
+    for retry in range(retries):
+        try:
+            return attempt()
+        except (requests.RequestException, ValueError) as e:
+            delay = backoff * (2 ** retry) * random.uniform(0.5, 1.5)
+            print(f"⚠️  Market page at offset {offset} failed ({e}), retrying in {delay:.2f}s")
+            time.sleep(delay)
+    return attempt()
+
+
+def bulk_download(
+    url: str,
+    api_key: str,
+    page_size: int = MARKET_BULK_PAGE_SIZE,
+    workers: int = MARKET_BULK_WORKERS,
+    max_records: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    Download the whole dataset: the first page reports the total record count,
+    the remaining offset pages are fetched concurrently on a bounded pool.
+
+    Args:
+        url: Resource URL
+        api_key: data.gov.in API key
+        page_size: Records per request
+        workers: Maximum concurrent requests
+        max_records: Stop after this many records (None for the full dataset)
+
+    Returns:
+        Response-shaped dict with all 'records' in dataset order, 'total',
+        'updated_date' and 'desc' (raises if any page fails after its retries)
+    """
+    started = time.time()
+    first = fetch_page(url, api_key, 0, page_size)
+    total = int(first.get("total") or 0)
+    if max_records:
+        total = min(total, max_records)
+
+    # Pages complete out of order; they are keyed by offset and joined in dataset order
+    pages: Dict[int, List[Dict[str, Any]]] = {0: first.get("records") or []}
+
+    offsets = range(page_size, total, page_size)
+    if offsets:
+        with ThreadPoolExecutor(max_workers=min(workers, len(offsets)), thread_name_prefix="market-bulk") as pool:
+            futures = {
+                pool.submit(fetch_page, url, api_key, offset, min(page_size, total - offset)): offset
+                for offset in offsets
+            }
+            try:
+                for future in as_completed(futures):
+                    offset = futures[future]
+                    pages[offset] = future.result().get("records") or []
+            except Exception:
+                for future in futures:
+                    future.cancel()
+                raise
+
+    records = [record for offset in sorted(pages) for record in pages[offset]]
+    if max_records:
+        records = records[:max_records]
+    print(f"📥 Downloaded {len(records)} of {total} market records in {len(pages)} pages ({time.time() - started:.2f} seconds)")
+    return {
+        "records": records,
+        "total": total,
+        "updated_date": first.get("updated_date"),
+        "desc": first.get("desc"),
+    }
@@ -0,0 +1,103 @@
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+CATEGORICAL_FIELDS = ("state", "district", "market", "commodity", "variety")
+PRICE_FIELDS = ("min_price", "max_price", "modal_price")
+
+
+def _parse_price(value: Any) -> float:
+    # data.gov.in prices are strings; "NR", "" and other non-numbers become NaN
+    try:
+        return float(str(value).replace(",", ""))
+    except (TypeError, ValueError):
+        return float("nan")
+
+
+class MarketColumns:
+    """
+    Column-oriented, dictionary-encoded copy of market records.
+
+    Each categorical field is stored as an int32 code array plus its sorted
+    labels; each price field as a float64 array with NaN for missing values
+    (``missing`` holds the masks). Filters become boolean masks and group-bys
+    are sort-and-reduce operations, so no per-record Python runs after the
+    one-time encoding.
+    """
+
+    def __init__(self, records: Sequence[Dict[str, Any]]):
+        self.size = len(records)
+        self.codes: Dict[str, np.ndarray] = {}
+        self.categories: Dict[str, List[str]] = {}
+        for field in CATEGORICAL_FIELDS:
+            values = np.array([(record.get(field) or "").strip() for record in records], dtype=object)
+            labels, codes = np.unique(values, return_inverse=True)
+            self.categories[field] = labels.tolist()
+            self.codes[field] = codes.astype(np.int32)
+        self.prices: Dict[str, np.ndarray] = {
+            field: np.fromiter((_parse_price(record.get(field)) for record in records), dtype=np.float64, count=self.size)
+            for field in PRICE_FIELDS
+        }
+        self.missing: Dict[str, np.ndarray] = {field: np.isnan(values) for field, values in self.prices.items()}
+        self._upper: Dict[str, List[str]] = {field: [label.upper() for label in labels] for field, labels in self.categories.items()}
+
+    def __len__(self) -> int:
+        return self.size
+
+    def _matching_codes(self, field: str, term: str) -> np.ndarray:
+        key = term.strip().upper()
+        return np.array([code for code, label in enumerate(self._upper[field]) if key in label], dtype=np.int32)
+
+    def mask(self, **filters: Optional[str]) -> np.ndarray:
+        """Rows whose categorical fields contain the given terms (case-insensitive), e.g. mask(state="Kerala")."""
+        selected = np.ones(self.size, dtype=bool)
+        for field, term in filters.items():
+            if term:
+                selected &= np.isin(self.codes[field], self._matching_codes(field, term))
+        return selected
+
+    def summary(self, price: str = "modal_price", mask: Optional[np.ndarray] = None) -> Dict[str, Any]:
+        """Count, mean, min, max and median of one price column over the selected rows."""
+        valid = ~self.missing[price] if mask is None else mask & ~self.missing[price]
+        values = self.prices[price][valid]
+        if not values.size:
+            return {"count": 0, "avg": None, "min": None, "max": None, "median": None}
+        return {
+            "count": int(values.size),
+            "avg": float(values.mean()),
+            "min": float(values.min()),
+            "max": float(values.max()),
+            "median": float(np.median(values)),
+        }
+
+    def group_stats(self, by: str = "commodity", price: str = "modal_price", mask: Optional[np.ndarray] = None) -> List[Dict[str, Any]]:
+        """
+        Per-group count, average, min and max of a price column.
+
+        Args:
+            by: Categorical field to group on
+            price: Price field to aggregate
+            mask: Optional row selection (see ``mask``)
+
+        Returns:
+            One dict per group with at least one valid price, ordered by group label
+        """
+        valid = ~self.missing[price] if mask is None else mask & ~self.missing[price]
+        codes = self.codes[by][valid]
+        values = self.prices[price][valid]
+        if not codes.size:
+            return []
+
+        # Sort by (group, price): each group is a contiguous run, its first value the min, its last the max
+        order = np.lexsort((values, codes))
+        codes, values = codes[order], values[order]
+        starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]])
+        ends = np.r_[starts[1:], codes.size] - 1
+        counts = ends - starts + 1
+        sums = np.add.reduceat(values, starts)
+
+        labels = self.categories[by]
+        return [
+            {"name": labels[code], "count": int(count), "avg": float(total / count), "min": float(low), "max": float(high)}
+            for code, count, total, low, high in zip(codes[starts], counts, sums, values[starts], values[ends])
+        ]
@@ -0,0 +1,217 @@
+import threading
+import time
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from .cache import TTLCache
+from .market_columns import MarketColumns
+
+
+class MarketSnapshot:
+    """
+    Immutable copy of the market dataset with hash indexes on state, district and commodity.
+
+    Index keys are the upper-cased field values. A filter term is resolved to
+    every key that contains it (the substring semantics of the old client-side
+    filters); the keys each term resolves to are memoized in a bounded LRU, so
+    repeated reads skip the scan.
+    ``columns`` holds the same records column-wise for vectorized aggregations.
+    """
+
+    FIELDS = ("state", "district", "commodity")
+    # Filter terms come straight from request arguments, so the memo is bounded
+    RESOLVED_TERMS = 512
+
+    def __init__(self, records: Iterable[Dict[str, Any]], updated_date: Optional[str] = None, desc: Optional[str] = None):
+        self.records = tuple(records)
+        self.updated_date = updated_date
+        self.desc = desc
+        self.loaded_at = time.time()
+        self.indexes: Dict[str, Dict[str, List[int]]] = {field: {} for field in self.FIELDS}
+        self.labels: Dict[str, Dict[str, str]] = {field: {} for field in self.FIELDS}
+        # Index key of every record, per field, for checking secondary filters row by row
+        self.row_keys: Dict[str, List[str]] = {field: [] for field in self.FIELDS}
+        for position, record in enumerate(self.records):
+            for field in self.FIELDS:
+                value = (record.get(field) or "").strip()
+                key = value.upper()
+                self.row_keys[field].append(key)
+                if not value:
+                    continue
+                self.indexes[field].setdefault(key, []).append(position)
+                self.labels[field].setdefault(key, value)
+        self._resolved = TTLCache(maxsize=self.RESOLVED_TERMS)
+        # Encoded here, on the refresh thread, so summaries never pay for it
+        self.columns = MarketColumns(self.records)
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def _keys(self, field: str, term: str) -> frozenset:
+        """Index keys containing ``term`` ("ONION" matches both "ONION" and "ONION GREEN")."""
+        term_key = term.strip().upper()
+        keys = self._resolved.get((field, term_key))
+        if keys is None:
+            keys = frozenset(key for key in self.indexes[field] if term_key in key)
+            self._resolved.set((field, term_key), keys)
+        return keys
+
+    def _matching(self, limit: Optional[int] = None, **filters: Optional[str]) -> Optional[List[int]]:
+        """Up to ``limit`` record positions matching every given filter in dataset order, or None when unfiltered."""
+        resolved = [(field, self._keys(field, term)) for field, term in filters.items() if term]
+        if not resolved:
+            return None
+
+        # Walk the rows of the most selective filter and check the others per row
+        def size(item) -> int:
+            field, keys = item
+            return sum(len(self.indexes[field][key]) for key in keys)
+
+        field, keys = min(resolved, key=size)
+        index = self.indexes[field]
+        if len(keys) == 1:
+            rows = index[next(iter(keys))]
+        else:
+            rows = sorted(position for key in keys for position in index[key])
+        others = [(other, other_keys) for other, other_keys in resolved if other != field]
+        if not others:
+            return rows[:limit]
+        matched = (p for p in rows if all(self.row_keys[other][p] in other_keys for other, other_keys in others))
+        return list(islice(matched, limit))
+
+    def query(
+        self,
+        state: Optional[str] = None,
+        district: Optional[str] = None,
+        commodity: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        """Records matching the filters (case-insensitive substring, like the API-side filters did)."""
+        positions = self._matching(limit, state=state, district=district, commodity=commodity)
+        if positions is None:
+            return list(self.records[:limit])
+        return [self.records[p] for p in positions]
+
+    def values(self, field: str, state: Optional[str] = None, district: Optional[str] = None) -> List[str]:
+        """Distinct display values of ``field`` among records matching the filters."""
+        positions = self._matching(state=state, district=district)
+        if positions is None:
+            return sorted(self.labels[field].values())
+        seen = {(self.records[p].get(field) or "").strip() for p in positions}
+        seen.discard("")
+        return sorted(seen)
+
+
+class MarketSnapshotStore:
+    """
+    Holds the current MarketSnapshot and refreshes it on a schedule.
+
+    Reads never wait on the network: only the warm-up and refresh threads load.
+    Until the first snapshot exists ``ensure`` returns None (callers fall back to
+    a direct API query) and the refresh thread retries every ``retry_after``
+    seconds; after that it swaps in a new snapshot every ``interval`` seconds and
+    a failed refresh keeps serving the previous one (reported as stale once older
+    than ``stale_after``).
+
+    Args:
+        loader: Callable returning the data.gov.in response dict (records, updated_date, desc)
+        interval: Seconds between scheduled refreshes
+        stale_after: Age in seconds after which the snapshot is reported stale
+        retry_after: Seconds between load attempts while no snapshot exists
+    """
+
+    def __init__(
+        self,
+        loader: Callable[[], Dict[str, Any]],
+        interval: float = 900.0,
+        stale_after: Optional[float] = None,
+        retry_after: float = 30.0,
+    ):
+        self.loader = loader
+        self.interval = interval
+        self.stale_after = stale_after if stale_after is not None else 2 * interval
+        self.retry_after = retry_after
+        self._snapshot: Optional[MarketSnapshot] = None
+        self._refresh_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._thread_lock = threading.Lock()
+        self._stats = {"refreshes": 0, "failures": 0, "last_error": None, "last_refresh_seconds": None}
+
+    @property
+    def snapshot(self) -> Optional[MarketSnapshot]:
+        return self._snapshot
+
+    def _load(self) -> Optional[MarketSnapshot]:
+        # Caller holds _refresh_lock
+        started = time.time()
+        try:
+            data = self.loader()
+            records = data.get("records") if data else None
+            if not records:
+                raise ValueError(data.get("desc") if data else "empty response")
+            snapshot = MarketSnapshot(records, data.get("updated_date"), data.get("desc"))
+        except Exception as e:
+            self._stats["failures"] += 1
+            self._stats["last_error"] = str(e)
+            print(f"⚠️  Market snapshot refresh failed: {e}")
+            return self._snapshot
+        self._snapshot = snapshot
+        self._stats["refreshes"] += 1
+        self._stats["last_error"] = None
+        self._stats["last_refresh_seconds"] = round(time.time() - started, 3)
+        print(f"📦 Market snapshot loaded: {len(snapshot)} records in {time.time() - started:.2f} seconds")
+        return snapshot
+
+    def refresh(self) -> Optional[MarketSnapshot]:
+        """Load a new snapshot and swap it in; on failure the previous snapshot stays current."""
+        with self._refresh_lock:
+            return self._load()
+
+    def load_initial(self) -> Optional[MarketSnapshot]:
+        """Load the first snapshot unless one exists (blocks; for the warm-up and refresh threads)."""
+        with self._refresh_lock:
+            if self._snapshot is None:
+                self._load()
+        return self._snapshot
+
+    def _run(self) -> None:
+        self.load_initial()
+        while True:
+            time.sleep(self.interval if self._snapshot is not None else self.retry_after)
+            self.refresh()
+
+    def start(self) -> None:
+        """Start the scheduled refresh thread (once)."""
+        with self._thread_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="market-snapshot", daemon=True)
+                self._thread.start()
+
+    def ensure(self) -> Optional[MarketSnapshot]:
+        """The current snapshot, or None until the refresh thread has loaded one (never blocks)."""
+        if self._thread is None:
+            self.start()
+        return self._snapshot
+
+    def staleness(self) -> Dict[str, Any]:
+        """Age of the current snapshot and whether it is older than ``stale_after``."""
+        snapshot = self._snapshot
+        if snapshot is None:
+            return {"loaded": False, "stale": True, "age_seconds": None, "refreshed_at": None}
+        age = time.time() - snapshot.loaded_at
+        return {
+            "loaded": True,
+            "stale": age > self.stale_after,
+            "age_seconds": round(age, 1),
+            "refreshed_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(snapshot.loaded_at)),
+            "updated_date": snapshot.updated_date,
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        snapshot = self._snapshot
+        return {
+            **self.staleness(),
+            **self._stats,
+            "records": len(snapshot) if snapshot is not None else 0,
+            "interval_seconds": self.interval,
+        }
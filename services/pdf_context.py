@@ -1,36 +1,171 @@
+import importlib.util
 import os
-import pickle
-from typing import List, Tuple, Dict
+import re
+import threading
+import time
+from typing import Any, Dict, List, Optional
 import numpy as np
 
-from PyPDF2 import PdfReader
+from .ann import load_or_train
+from .bm25 import BM25Index
+from .cache import TTLCache
+from .context_packer import pack_context
+from .embedding_server import EmbeddingClient
+from .embedding_store import EmbeddingStore, migrate_pickle_cache
+from .pdf_indexer import extract_corpus, update_index
+from .quantization import load_or_quantize, rerank
+from .vector_search import exact_search
 
-# Try to import sentence transformers for embeddings
-try:
-    from sentence_transformers import SentenceTransformer
-    EMBEDDINGS_AVAILABLE = True
-except ImportError:
-    EMBEDDINGS_AVAILABLE = False
+# sentence-transformers pulls in torch, so it is only imported when the model is first needed
+EMBEDDINGS_AVAILABLE = importlib.util.find_spec("sentence_transformers") is not None
+if not EMBEDDINGS_AVAILABLE:
     print("⚠️  sentence-transformers not installed. Run: pip install sentence-transformers")
 
+EMBEDDING_MODEL_NAME = "all-MiniLM-L6-v2"
+
 PDF_DIRECTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "pdfs")
 PDF_DIRECTORY = os.path.abspath(PDF_DIRECTORY)
-CACHE_FILE = os.path.join(PDF_DIRECTORY, ".pdf_embeddings_cache.pkl")
+# Memory-mapped index shared by all workers; the pickle file is only read for migration
+INDEX_DIRECTORY = os.getenv("PDF_INDEX_DIR", os.path.join(PDF_DIRECTORY, ".pdf_index"))
+LEGACY_CACHE_FILE = os.path.join(PDF_DIRECTORY, ".pdf_embeddings_cache.pkl")
+
+# Approximate (IVF) search: "auto" switches it on for large indexes, "on"/"off" force it
+PDF_ANN_INDEX = os.getenv("PDF_ANN_INDEX", "auto").lower()
+PDF_ANN_MIN_ROWS = int(os.getenv("PDF_ANN_MIN_ROWS", "200000"))
+PDF_ANN_NLIST = int(os.getenv("PDF_ANN_NLIST", "0")) or None
+PDF_ANN_NPROBE = int(os.getenv("PDF_ANN_NPROBE", "8"))
+
+# PDF_EMBEDDING_DTYPE=int8 scores against a 4x smaller quantized matrix; the shortlist
+# (PDF_RERANK_FACTOR x top_k rows) is re-ranked on the exact float32 rows unless PDF_RERANK=0
+PDF_EMBEDDING_DTYPE = os.getenv("PDF_EMBEDDING_DTYPE", "float32").lower()
+PDF_RERANK = os.getenv("PDF_RERANK", "1") != "0"
+PDF_RERANK_FACTOR = max(int(os.getenv("PDF_RERANK_FACTOR", "4")), 1)
 
 # Global cache for embeddings
 _PDF_CACHE: Dict[str, any] = {
-    "paragraphs": [],
+    "paragraphs": [],  # chunk texts, one per row
+    "metadata": None,  # {'source', 'page', 'offset'} per row, if known
     "embeddings": None,
+    "matrix": None,  # unit-length float32 rows, ready for one matrix-vector product
     "model": None,
+    "ann": None,  # optional IVF index over the matrix
+    "quantized": None,  # optional int8 copy of the matrix used for scoring
+    "bm25": None,  # keyword fallback index, built with the PDF index when embeddings are off
+    "generation": None,  # store generation the cache was loaded from
     "loaded": False
 }
+_LOAD_LOCK = threading.Lock()
+
+# Optional shared embedding/retrieval server (see services/embedding_server.py). Workers
+# fall back to loading the model and index in-process while it is unreachable.
+EMBEDDING_SERVER_SOCKET = os.getenv("EMBEDDING_SERVER_SOCKET")
+EMBEDDING_SERVER_TIMEOUT = float(os.getenv("EMBEDDING_SERVER_TIMEOUT", "5"))
+EMBEDDING_SERVER_RETRY_SECONDS = float(os.getenv("EMBEDDING_SERVER_RETRY_SECONDS", "30"))
+_REMOTE: Dict[str, Any] = {"retry_at": 0.0, "connected": False}
+
+# Farmers repeat the same questions; reuse their embeddings instead of re-running the model
+QUERY_EMBEDDING_CACHE_SIZE = int(os.getenv("QUERY_EMBEDDING_CACHE_SIZE", "2048"))
+QUERY_EMBEDDING_CACHE_TTL = float(os.getenv("QUERY_EMBEDDING_CACHE_TTL", "86400"))
+_QUERY_EMBEDDINGS = TTLCache(maxsize=QUERY_EMBEDDING_CACHE_SIZE, ttl=QUERY_EMBEDDING_CACHE_TTL)
+
+# Batch retrieval encodes this many queries per forward pass and scores this many per matrix product
+QUERY_ENCODE_BATCH_SIZE = int(os.getenv("QUERY_ENCODE_BATCH_SIZE", "64"))
+QUERY_SCORE_BATCH_SIZE = int(os.getenv("QUERY_SCORE_BATCH_SIZE", "256"))
+
+
+def _get_model():
+    """Load the sentence-transformer once per process."""
+    if _PDF_CACHE["model"] is None:
+        from sentence_transformers import SentenceTransformer
+        _PDF_CACHE["model"] = SentenceTransformer(EMBEDDING_MODEL_NAME)
+    return _PDF_CACHE["model"]
+
+
+def _encode_paragraphs(paragraphs: List[str]) -> np.ndarray:
+    print(f"🧠 Creating embeddings for {len(paragraphs)} paragraphs...")
+    return _get_model().encode(paragraphs, show_progress_bar=len(paragraphs) > 256)
+
+
+def _use_store(store: EmbeddingStore) -> None:
+    """Point the retrieval cache at a memory-mapped store instead of private copies."""
+    _PDF_CACHE["paragraphs"] = store.paragraphs
+    _PDF_CACHE["metadata"] = store.metadata
+    _PDF_CACHE["embeddings"] = store.matrix
+    _PDF_CACHE["matrix"] = store.matrix
+    _PDF_CACHE["ann"] = None
+    _PDF_CACHE["quantized"] = None
+    _PDF_CACHE["generation"] = store.meta.get("generation")
+
+    if PDF_EMBEDDING_DTYPE == "int8" and len(store) and store.matrix.shape[1]:
+        try:
+            _PDF_CACHE["quantized"] = load_or_quantize(store.matrix, store.directory, store.meta.get("generation"))
+        except Exception as e:
+            print(f"⚠️  Error quantizing embeddings: {e}, using float32 search")
+
+    use_ann = PDF_ANN_INDEX == "on" or (PDF_ANN_INDEX == "auto" and len(store) >= PDF_ANN_MIN_ROWS)
+    if use_ann and len(store) and store.matrix.shape[1]:
+        try:
+            _PDF_CACHE["ann"] = load_or_train(store.matrix, store.directory, store.meta.get("generation"), nlist=PDF_ANN_NLIST)
+        except Exception as e:
+            print(f"⚠️  Error building IVF index: {e}, using exact search")
 
 
 def _load_pdfs_and_create_embeddings():
-    """Load all PDFs and create vector embeddings once at startup."""
+    """Load all PDFs and create vector embeddings once, on first use or during warm-up."""
     if _PDF_CACHE["loaded"]:
         return
-    
+    with _LOAD_LOCK:
+        if not _PDF_CACHE["loaded"]:
+            _build_pdf_cache()
+
+
+def get_index_generation() -> Optional[str]:
+    """Generation of the PDF index answers are retrieved from (local store or embedding server)."""
+    if _PDF_CACHE["loaded"]:
+        return _PDF_CACHE["generation"]
+    return _REMOTE.get("generation")
+
+
+def is_pdf_index_ready() -> bool:
+    return _PDF_CACHE["loaded"]
+
+
+def _remote_client() -> Optional[EmbeddingClient]:
+    """Client for the shared embedding server, or None if not configured or backing off."""
+    if not EMBEDDING_SERVER_SOCKET or time.monotonic() < _REMOTE["retry_at"]:
+        return None
+    return EmbeddingClient(EMBEDDING_SERVER_SOCKET, timeout=EMBEDDING_SERVER_TIMEOUT, on_generation=_remote_generation)
+
+
+def _remote_generation(generation: Optional[str]) -> None:
+    # Called for every successful server reply: refreshing the generation lets a server
+    # restarted on a rebuilt index invalidate the answer cache at the next lookup, and
+    # marks retrieval ready even when no warm-up ran (AGRI_WARMUP=0)
+    _REMOTE["generation"] = generation
+    _REMOTE["connected"] = True
+
+
+def _remote_failed(error: Exception) -> None:
+    print(f"⚠️  Embedding server unavailable ({error}), using in-process retrieval")
+    _REMOTE["connected"] = False
+    _REMOTE["retry_at"] = time.monotonic() + EMBEDDING_SERVER_RETRY_SECONDS
+
+
+def warm_retrieval() -> None:
+    """Warm-up hook: connect to the embedding server if configured, else load the index locally."""
+    client = _remote_client()
+    status = client.status() if client is not None else None
+    if status is not None:
+        _REMOTE["connected"] = True
+        return
+    _load_pdfs_and_create_embeddings()
+
+
+def is_retrieval_ready() -> bool:
+    return _REMOTE["connected"] or is_pdf_index_ready()
+
+
+def _build_pdf_cache():
     print("🔄 Loading PDFs and creating embeddings...")
     
     if not os.path.isdir(PDF_DIRECTORY):
@@ -38,137 +173,243 @@ def _load_pdfs_and_create_embeddings():
         _PDF_CACHE["loaded"] = True
         return
     
-    # Try to load from cache first
-    if os.path.exists(CACHE_FILE):
-        try:
-            with open(CACHE_FILE, 'rb') as f:
-                cache_data = pickle.load(f)
-                _PDF_CACHE["paragraphs"] = cache_data["paragraphs"]
-                _PDF_CACHE["embeddings"] = cache_data["embeddings"]
-                print(f"✅ Loaded {len(_PDF_CACHE['paragraphs'])} paragraphs from cache")
-                _PDF_CACHE["loaded"] = True
-                
-                # Load embedding model
-                if EMBEDDINGS_AVAILABLE:
-                    _PDF_CACHE["model"] = SentenceTransformer('all-MiniLM-L6-v2')
-                return
-        except Exception as e:
-            print(f"⚠️  Failed to load cache: {e}")
+    # Open the memory-mapped store, migrating the old pickle cache if needed
+    store = EmbeddingStore.open(INDEX_DIRECTORY)
+    if store is None and os.path.exists(LEGACY_CACHE_FILE):
+        store = migrate_pickle_cache(LEGACY_CACHE_FILE, INDEX_DIRECTORY)
     
-    # Load PDFs from scratch
-    all_paragraphs = []
-    
-    for filename in os.listdir(PDF_DIRECTORY):
-        if not filename.lower().endswith(".pdf"):
-            continue
-        file_path = os.path.join(PDF_DIRECTORY, filename)
+    if EMBEDDINGS_AVAILABLE:
+        # Only new or changed PDFs are extracted and embedded
         try:
-            with open(file_path, "rb") as pdf_file:
-                reader = PdfReader(pdf_file)
-                text_buffer = []
-                for page in reader.pages:
-                    text_buffer.append(page.extract_text() or "")
-                full_text = "\n".join(text_buffer)
-            
-            # Split into paragraphs
-            paragraphs = [para.strip() for para in full_text.split("\n\n") if para.strip() and len(para.strip()) > 50]
-            all_paragraphs.extend(paragraphs)
-            print(f"📄 Loaded {filename}: {len(paragraphs)} paragraphs")
+            store = update_index(PDF_DIRECTORY, INDEX_DIRECTORY, _encode_paragraphs, EMBEDDING_MODEL_NAME, existing=store)
         except Exception as e:
-            print(f"⚠️  Error loading {filename}: {e}")
-            continue
+            print(f"⚠️  Error updating PDF index: {e}")
+        if store is not None:
+            _get_model()
     
-    _PDF_CACHE["paragraphs"] = all_paragraphs
-    print(f"📚 Total paragraphs loaded: {len(all_paragraphs)}")
+    if store is not None:
+        _use_store(store)
+        print(f"✅ Loaded {len(store)} chunks from {INDEX_DIRECTORY}")
+    else:
+        # No embeddings: keep the extracted chunks for keyword matching
+        chunks = extract_corpus(PDF_DIRECTORY)
+        _PDF_CACHE["paragraphs"] = [chunk["text"] for chunk in chunks]
+        _PDF_CACHE["metadata"] = [{key: chunk[key] for key in ("source", "page", "offset")} for chunk in chunks]
+        print(f"📚 Total chunks loaded: {len(chunks)}")
     
-    # Create embeddings if available
-    if EMBEDDINGS_AVAILABLE and all_paragraphs:
-        try:
-            print("🧠 Creating embeddings...")
-            model = SentenceTransformer('all-MiniLM-L6-v2')
-            embeddings = model.encode(all_paragraphs, show_progress_bar=True)
-            _PDF_CACHE["embeddings"] = embeddings
-            _PDF_CACHE["model"] = model
-            
-            # Save to cache
-            cache_data = {
-                "paragraphs": all_paragraphs,
-                "embeddings": embeddings
-            }
-            with open(CACHE_FILE, 'wb') as f:
-                pickle.dump(cache_data, f)
-            print(f"💾 Embeddings cached to {CACHE_FILE}")
-        except Exception as e:
-            print(f"⚠️  Error creating embeddings: {e}")
+    if _PDF_CACHE["model"] is None:
+        _build_keyword_index()
     
     _PDF_CACHE["loaded"] = True
     print("✅ PDF indexing complete!")
 
 
-def _cosine_similarity(a, b):
-    """Calculate cosine similarity between two vectors."""
-    return np.dot(a, b) / (np.linalg.norm(a) * np.linalg.norm(b))
+def normalize_query(query: str) -> str:
+    """Cache key for a query: lowercase words without punctuation or extra whitespace."""
+    return " ".join(re.sub(r"[^\w\s-]", " ", query.lower()).split())
 
 
-def _collect_keywords(query: str) -> List[str]:
-    return [word.strip().lower() for word in query.split() if len(word) > 2]
+def encode_query(query: str) -> np.ndarray:
+    """Embed a query, reusing the cached vector for repeated questions."""
+    return encode_queries([query])[0]
 
 
-def _score_paragraphs(paragraphs: List[str], keywords: List[str]) -> List[Tuple[int, str]]:
-    scored = []
-    for paragraph in paragraphs:
-        score = sum(1 for keyword in keywords if keyword in paragraph.lower())
-        if score:
-            scored.append((score, paragraph))
-    return scored
+def encode_queries(queries: List[str]) -> np.ndarray:
+    """
+    Embed many queries with a single batched model call for the uncached ones.
 
+    Args:
+        queries: Query strings
 
-def get_context_from_pdfs(query: str, top_k: int = 2) -> str:
+    Returns:
+        Embedding matrix with one row per query, in input order
     """
-    Retrieve most relevant context from PDFs using RAG with vector embeddings.
-    Falls back to keyword matching if embeddings are not available.
+    keys = [normalize_query(query) for query in queries]
+    embeddings: Dict[str, np.ndarray] = {}
+    missing: Dict[str, str] = {}
+    for key, query in zip(keys, queries):
+        if key in embeddings or key in missing:
+            continue
+        cached = _QUERY_EMBEDDINGS.get(key)
+        if cached is None:
+            missing[key] = query
+        else:
+            embeddings[key] = cached
+
+    if missing:
+        encoded = None
+        client = _remote_client()
+        if client is not None:
+            try:
+                encoded = client.encode(list(missing.values()))
+            except (OSError, ValueError, RuntimeError) as e:
+                _remote_failed(e)
+        if encoded is None:
+            encoded = _get_model().encode(list(missing.values()), batch_size=QUERY_ENCODE_BATCH_SIZE)
+        for key, vector in zip(missing, encoded):
+            vector = np.asarray(vector, dtype=np.float32)
+            vector.setflags(write=False)
+            _QUERY_EMBEDDINGS.set(key, vector)
+            embeddings[key] = vector
+
+    return np.stack([embeddings[key] for key in keys])
+
+
+def get_query_cache_stats():
+    return _QUERY_EMBEDDINGS.stats()
+
+
+def _build_keyword_index() -> BM25Index:
+    index = BM25Index.build(_PDF_CACHE["paragraphs"])
+    _PDF_CACHE["bm25"] = index
+    print(f"🔎 Keyword index built: {len(index.postings)} terms over {len(index)} paragraphs")
+    return index
+
+
+def _get_keyword_index() -> BM25Index:
+    """Return the BM25 index, building it on first use when embeddings normally serve queries."""
+    if _PDF_CACHE["bm25"] is None:
+        with _LOAD_LOCK:
+            if _PDF_CACHE["bm25"] is None:
+                _build_keyword_index()
+    return _PDF_CACHE["bm25"]
+
+
+def _chunk_record(index: int, score: float) -> Dict[str, Any]:
+    record = {"text": _PDF_CACHE["paragraphs"][index], "score": score, "row": index}
+    if _PDF_CACHE["metadata"] is not None:
+        record.update(_PDF_CACHE["metadata"][index])
+    return record
+
+
+def search_paragraphs(query_vectors, top_k: int = 2) -> List[List[Dict[str, Any]]]:
+    """
+    Rank indexed chunks for one or more already-encoded query vectors.
+
+    Args:
+        query_vectors: A single embedding or a (queries x dim) batch of embeddings
+        top_k: Number of chunks to return per query
+
+    Returns:
+        One list of chunk records per query, best first. Each record holds 'text',
+        'score', 'row' and, when known, 'source', 'page' and 'offset'.
     """
+    if not _PDF_CACHE["loaded"]:
+        _load_pdfs_and_create_embeddings()
+
+    matrix = _PDF_CACHE["matrix"]
+    if matrix is None or not len(matrix):
+        return []
+
+    quantized = _PDF_CACHE["quantized"]
+    shortlist = top_k * PDF_RERANK_FACTOR if quantized is not None and PDF_RERANK else top_k
+    if _PDF_CACHE["ann"] is not None:
+        results = _PDF_CACHE["ann"].search(quantized if quantized is not None else matrix, query_vectors, shortlist, nprobe=PDF_ANN_NPROBE)
+    elif quantized is not None:
+        results = quantized.search(query_vectors, shortlist)
+    else:
+        results = exact_search(matrix, query_vectors, top_k)
+    if shortlist != top_k:
+        results = rerank(matrix, query_vectors, results, top_k)
+    return [[_chunk_record(index, score) for index, score in hits] for hits in results]
+
+
+def get_context_chunks(query: str, top_k: int = 2) -> List[Dict[str, Any]]:
+    """
+    Retrieve the most relevant chunks with their source file, page and offset.
+    Falls back to BM25 keyword ranking if embeddings are not available.
+    """
+    client = _remote_client()
+    if client is not None:
+        try:
+            return client.search([query], top_k)[0]
+        except (OSError, ValueError, RuntimeError) as e:
+            _remote_failed(e)
+    
     # Ensure PDFs are loaded
     if not _PDF_CACHE["loaded"]:
         _load_pdfs_and_create_embeddings()
     
     if not _PDF_CACHE["paragraphs"]:
-        return ""
+        return []
     
     # Use vector similarity if embeddings are available
-    if EMBEDDINGS_AVAILABLE and _PDF_CACHE["embeddings"] is not None and _PDF_CACHE["model"] is not None:
+    if EMBEDDINGS_AVAILABLE and _PDF_CACHE["matrix"] is not None and _PDF_CACHE["model"] is not None:
         try:
-            # Encode the query
-            query_embedding = _PDF_CACHE["model"].encode([query])[0]
-            
-            # Calculate similarities
-            similarities = []
-            for i, para_embedding in enumerate(_PDF_CACHE["embeddings"]):
-                similarity = _cosine_similarity(query_embedding, para_embedding)
-                similarities.append((similarity, _PDF_CACHE["paragraphs"][i]))
-            
-            # Sort by similarity and get top-k
-            similarities.sort(key=lambda x: x[0], reverse=True)
-            top_paragraphs = [para for _, para in similarities[:top_k]]
-            
-            return "\n\n".join(top_paragraphs)
+            # Encode the query and score it against every chunk in one product
+            results = search_paragraphs(encode_query(query), top_k)
+            return results[0] if results else []
         except Exception as e:
             print(f"⚠️  Error in vector search: {e}, falling back to keyword matching")
     
-    # Fallback: Keyword-based matching
-    keywords = _collect_keywords(query)
-    if not keywords:
-        return ""
-    
-    matches = _score_paragraphs(_PDF_CACHE["paragraphs"], keywords)
-    
-    if not matches:
-        return ""
-    
-    matches.sort(key=lambda item: item[0], reverse=True)
-    top_paragraphs = [para for _, para in matches[:top_k]]
-    return "\n\n".join(top_paragraphs)
+    # Fallback: BM25 keyword ranking over the inverted index
+    return [_chunk_record(index, score) for index, score in _get_keyword_index().search(query, top_k)]
 
 
-# Initialize embeddings when module is imported
-_load_pdfs_and_create_embeddings()
+def get_context_chunks_batch(queries: List[str], top_k: int = 2) -> List[List[Dict[str, Any]]]:
+    """
+    Retrieve the top-k chunks for many queries at once (offline evaluation, bulk jobs).
+
+    Queries are embedded in batched model calls and scored against the index with
+    one matrix product per ``QUERY_SCORE_BATCH_SIZE`` queries, so the score matrix
+    stays bounded however many queries are passed.
+
+    Args:
+        queries: Query strings
+        top_k: Number of chunks to return per query
+
+    Returns:
+        One list of chunk records per query, in input order (see ``search_paragraphs``)
+    """
+    client = _remote_client()
+    if client is not None and queries:
+        try:
+            results: List[List[Dict[str, Any]]] = []
+            for start in range(0, len(queries), QUERY_SCORE_BATCH_SIZE):
+                results.extend(client.search(queries[start:start + QUERY_SCORE_BATCH_SIZE], top_k))
+            return results
+        except (OSError, ValueError, RuntimeError) as e:
+            _remote_failed(e)
+
+    if not _PDF_CACHE["loaded"]:
+        _load_pdfs_and_create_embeddings()
+
+    if not queries or not _PDF_CACHE["paragraphs"]:
+        return [[] for _ in queries]
+
+    if EMBEDDINGS_AVAILABLE and _PDF_CACHE["matrix"] is not None and _PDF_CACHE["model"] is not None:
+        try:
+            results: List[List[Dict[str, Any]]] = []
+            for start in range(0, len(queries), QUERY_SCORE_BATCH_SIZE):
+                batch = queries[start:start + QUERY_SCORE_BATCH_SIZE]
+                results.extend(search_paragraphs(encode_queries(batch), top_k) or [[] for _ in batch])
+            return results
+        except Exception as e:
+            print(f"⚠️  Error in batch vector search: {e}, falling back to keyword matching")
+
+    keyword_index = _get_keyword_index()
+    return [[_chunk_record(index, score) for index, score in keyword_index.search(query, top_k)] for query in queries]
+
+
+def _corpus_idf():
+    """Corpus-wide IDF for context packing, if the keyword index happens to be loaded."""
+    index = _PDF_CACHE["bm25"]
+    return index.idf if index is not None else None
+
+
+def get_contexts_from_pdfs(queries: List[str], top_k: int = 2) -> List[str]:
+    """Batch counterpart of ``get_context_from_pdfs``: one context string per query."""
+    return [
+        pack_context(query, chunks, idf=_corpus_idf())
+        for query, chunks in zip(queries, get_context_chunks_batch(queries, top_k))
+    ]
+
+
+def get_context_from_pdfs(query: str, top_k: int = 2) -> str:
+    """
+    Retrieve most relevant context from PDFs using RAG with vector embeddings.
+    Falls back to keyword matching if embeddings are not available.
+    The chunks are packed into the prompt token budget, keeping the sentences
+    closest to the query.
+    """
+    return pack_context(query, get_context_chunks(query, top_k), idf=_corpus_idf())
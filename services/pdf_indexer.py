@@ -0,0 +1,337 @@
+import fcntl
+import hashlib
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+from PyPDF2 import PdfReader
+
+from .chunking import chunk_pages, chunker_settings
+from .dedup import DEDUP_THRESHOLD, NUM_PERMUTATIONS, NearDuplicateIndex, minhash_signatures
+from .embedding_store import EmbeddingStore
+
+# Cold builds fan page ranges out over a process pool; 1 keeps extraction in-process
+PDF_EXTRACT_WORKERS = int(os.getenv("PDF_EXTRACT_WORKERS", "0")) or (os.cpu_count() or 1)
+PDF_PAGES_PER_TASK = max(int(os.getenv("PDF_PAGES_PER_TASK", "16")), 1)
+
+# Collapse near-duplicate chunks (reprinted circulars, repeated scheme text) before encoding
+PDF_DEDUP = os.getenv("PDF_DEDUP", "1") != "0"
+
+# Held while a process updates the store so concurrent workers build it once
+INDEX_LOCK_FILE = "build.lock"
+
+
+def dedup_settings() -> Dict[str, Any]:
+    return {"enabled": PDF_DEDUP, "threshold": DEDUP_THRESHOLD, "permutations": NUM_PERMUTATIONS}
+
+
+def list_pdfs(pdf_directory: str) -> List[str]:
+    """Return the PDF file names in ``pdf_directory`` in a stable order."""
+    return sorted(name for name in os.listdir(pdf_directory) if name.lower().endswith(".pdf"))
+
+
+def hash_file(file_path: str) -> str:
+    """SHA-256 of a file's content, read in 1 MiB blocks."""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as handle:
+        for block in iter(lambda: handle.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _page_count(file_path: str) -> int:
+    with open(file_path, "rb") as pdf_file:
+        return len(PdfReader(pdf_file).pages)
+
+
+def _extract_page_range(file_path: str, start: int, end: int) -> List[str]:
+    """Extract the text of pages [start, end) of one PDF (runs inside pool workers)."""
+    with open(file_path, "rb") as pdf_file:
+        reader = PdfReader(pdf_file)
+        end = min(end, len(reader.pages))
+        return [reader.pages[number].extract_text() or "" for number in range(start, end)]
+
+
+def extract_chunks(file_path: str) -> List[Dict[str, Any]]:
+    """Extract the text of one PDF and split it into token-bounded chunks."""
+    return chunk_pages(_extract_page_range(file_path, 0, _page_count(file_path)), os.path.basename(file_path))
+
+
+def extract_documents(file_paths: List[str], workers: Optional[int] = None) -> List[Union[List[Dict[str, Any]], Exception]]:
+    """
+    Extract several PDFs in parallel, split across documents and page ranges.
+
+    Every document is cut into ranges of ``PDF_PAGES_PER_TASK`` pages that are
+    extracted by a process pool; the pages are stitched back together in their
+    original order before chunking, so the chunks match a serial extraction exactly.
+
+    Args:
+        file_paths: PDFs to extract
+        workers: Pool size (defaults to ``PDF_EXTRACT_WORKERS``)
+
+    Returns:
+        For each input path, in order, its chunks or the exception that stopped it
+    """
+    workers = workers or PDF_EXTRACT_WORKERS
+    results: List[Union[List[Dict[str, Any]], Exception]] = []
+
+    # Never start a nested pool from inside a pool worker
+    if multiprocessing.parent_process() is not None:
+        workers = 1
+
+    if workers <= 1 or not file_paths:
+        for file_path in file_paths:
+            try:
+                results.append(extract_chunks(file_path))
+            except Exception as e:
+                results.append(e)
+        return results
+
+    tasks: List[Tuple[int, int, int]] = []
+    page_texts: List[Union[List[Optional[List[str]]], Exception]] = []
+    for doc_index, file_path in enumerate(file_paths):
+        try:
+            pages = _page_count(file_path)
+        except Exception as e:
+            page_texts.append(e)
+            continue
+        ranges = list(range(0, pages, PDF_PAGES_PER_TASK))
+        page_texts.append([None] * len(ranges))
+        tasks.extend((doc_index, slot, start) for slot, start in enumerate(ranges))
+
+    # Spawned, not forked: this runs on the warm-up thread while request threads hold locks
+    spawn = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=min(workers, len(tasks)) or 1, mp_context=spawn) as pool:
+        futures = [
+            (doc_index, slot, pool.submit(_extract_page_range, file_paths[doc_index], start, start + PDF_PAGES_PER_TASK))
+            for doc_index, slot, start in tasks
+        ]
+        for doc_index, slot, future in futures:
+            if isinstance(page_texts[doc_index], Exception):
+                continue
+            try:
+                page_texts[doc_index][slot] = future.result()
+            except Exception as e:
+                page_texts[doc_index] = e
+
+    for file_path, texts in zip(file_paths, page_texts):
+        if isinstance(texts, Exception):
+            results.append(texts)
+        else:
+            results.append(chunk_pages([page for block in texts for page in block], os.path.basename(file_path)))
+    return results
+
+
+def extract_corpus(pdf_directory: str) -> List[Dict[str, Any]]:
+    """Extract and chunk every PDF in ``pdf_directory`` without embedding anything."""
+    filenames = list_pdfs(pdf_directory)
+    extracted = extract_documents([os.path.join(pdf_directory, name) for name in filenames])
+    all_chunks: List[Dict[str, Any]] = []
+    for filename, chunks in zip(filenames, extracted):
+        if isinstance(chunks, Exception):
+            print(f"⚠️  Error loading {filename}: {chunks}")
+            continue
+        all_chunks.extend(chunks)
+        print(f"📄 Loaded {filename}: {len(chunks)} chunks")
+    return all_chunks
+
+
+def _document_fingerprint(file_path: str, previous: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    stat = os.stat(file_path)
+    fingerprint = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+    # Unchanged size and mtime means unchanged content; skip re-hashing large PDFs
+    if previous and previous.get("size") == stat.st_size and previous.get("mtime_ns") == stat.st_mtime_ns:
+        fingerprint["sha256"] = previous["sha256"]
+    else:
+        fingerprint["sha256"] = hash_file(file_path)
+    return fingerprint
+
+
+def update_index(
+    pdf_directory: str,
+    index_directory: str,
+    encode: Callable[[List[str]], np.ndarray],
+    model_name: str,
+    existing: Optional[EmbeddingStore] = None,
+) -> Optional[EmbeddingStore]:
+    """
+    Bring the embedding store in line with the PDFs on disk, re-embedding only what changed.
+
+    The store's meta.json carries a manifest with each document's content hash and
+    its [start, end) chunk row range. Documents whose hash is unchanged keep
+    their rows, new or modified documents are extracted, chunked and encoded, and
+    documents that disappeared from ``pdf_directory`` are dropped.
+
+    Args:
+        pdf_directory: Directory containing the source PDFs
+        index_directory: Embedding store directory
+        encode: Callable turning a list of chunk texts into an embedding matrix
+        model_name: Name of the embedding model; a change invalidates every row
+        existing: Already opened store for ``index_directory``, if any
+
+    Returns:
+        The up-to-date store, or None if there is nothing to index
+    """
+    os.makedirs(index_directory, exist_ok=True)
+    with open(os.path.join(index_directory, INDEX_LOCK_FILE), "a") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            # Another worker may have finished a build while this one waited; start from its store
+            return _update_index(pdf_directory, index_directory, encode, model_name, EmbeddingStore.open(index_directory) or existing)
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def _update_index(
+    pdf_directory: str,
+    index_directory: str,
+    encode: Callable[[List[str]], np.ndarray],
+    model_name: str,
+    existing: Optional[EmbeddingStore],
+) -> Optional[EmbeddingStore]:
+    # Caller holds the index lock
+    # Rows are only reusable if they came from the same model, chunker and dedup settings
+    reusable = (
+        existing is not None
+        and existing.metadata is not None
+        and existing.meta.get("model") == model_name
+        and existing.meta.get("chunker") == chunker_settings()
+        and existing.meta.get("dedup") == dedup_settings()
+    )
+    previous_docs: Dict[str, Dict[str, Any]] = {}
+    if reusable:
+        previous_docs = {doc["name"]: doc for doc in existing.meta.get("documents", [])}
+
+    documents: List[Dict[str, Any]] = []
+    row_blocks: List[np.ndarray] = []
+    signature_blocks: List[np.ndarray] = []
+    all_texts: List[str] = []
+    all_metadata: List[Dict[str, Any]] = []
+    changed = not reusable
+    added = reused = collapsed = 0
+
+    fingerprints: List[Tuple[str, Dict[str, Any]]] = []
+    for filename in list_pdfs(pdf_directory):
+        try:
+            fingerprints.append((filename, _document_fingerprint(os.path.join(pdf_directory, filename), previous_docs.get(filename))))
+        except OSError as e:
+            print(f"⚠️  Error reading {filename}: {e}")
+
+    pending = {
+        filename for filename, fingerprint in fingerprints
+        if previous_docs.get(filename, {}).get("sha256") != fingerprint["sha256"]
+    }
+    # A document whose chunks were collapsed into another document's chunks must be
+    # re-indexed when that other document changes or disappears
+    invalidated = (set(previous_docs) - {name for name, _ in fingerprints}) | (pending & set(previous_docs))
+    while invalidated:
+        affected = {
+            filename for filename, _ in fingerprints
+            if filename not in pending and invalidated & set(previous_docs[filename].get("dedup_sources", []))
+        }
+        pending |= affected
+        invalidated = affected
+
+    # Extract every new or changed document in one parallel pass
+    ordered_pending = [filename for filename, _ in fingerprints if filename in pending]
+    extracted = dict(zip(ordered_pending, extract_documents([os.path.join(pdf_directory, name) for name in ordered_pending])))
+
+    duplicates: Optional[NearDuplicateIndex] = None
+    if PDF_DEDUP and pending:
+        duplicates = _existing_signature_index(existing, previous_docs, [name for name, _ in fingerprints if name not in pending])
+
+    for filename, fingerprint in fingerprints:
+        previous = previous_docs.get(filename)
+        start = len(all_texts)
+        document = {"name": filename, **fingerprint}
+        if filename not in extracted:
+            all_texts.extend(existing.paragraphs[previous["start"]:previous["end"]])
+            all_metadata.extend(existing.metadata[previous["start"]:previous["end"]])
+            row_blocks.append(np.asarray(existing.matrix[previous["start"]:previous["end"]]))
+            if PDF_DEDUP:
+                signature_blocks.append(_document_signatures(existing, previous))
+            for key in ("duplicates", "dedup_sources"):
+                if key in previous:
+                    document[key] = previous[key]
+            reused += 1
+            if previous.get("mtime_ns") != fingerprint["mtime_ns"]:
+                changed = True  # record the new mtime so the next start skips hashing again
+        else:
+            changed = True
+            chunks = extracted[filename]
+            if isinstance(chunks, Exception):
+                print(f"⚠️  Error loading {filename}: {chunks}")
+                continue
+            if duplicates is not None:
+                signatures = minhash_signatures([chunk["text"] for chunk in chunks])
+                keep, sources = [], set()
+                for chunk, signature in zip(chunks, signatures):
+                    owner = duplicates.find_duplicate(signature)
+                    if owner is None:
+                        duplicates.add(signature, filename)
+                        keep.append(True)
+                    else:
+                        keep.append(False)
+                        if owner != filename:
+                            sources.add(owner)
+                dropped = keep.count(False)
+                chunks = [chunk for chunk, kept in zip(chunks, keep) if kept]
+                signatures = signatures[np.asarray(keep, dtype=bool)] if len(keep) else signatures
+                document.update({"duplicates": dropped, "dedup_sources": sorted(sources)})
+                signature_blocks.append(signatures)
+                collapsed += dropped
+            texts = [chunk["text"] for chunk in chunks]
+            if texts:
+                row_blocks.append(np.asarray(encode(texts), dtype=np.float32))
+            all_texts.extend(texts)
+            all_metadata.extend({key: chunk[key] for key in ("source", "page", "offset")} for chunk in chunks)
+            added += 1
+            print(f"📄 Indexed {filename}: {len(chunks)} chunks ({document.get('duplicates', 0)} near-duplicates collapsed)")
+
+        document.update({"start": start, "end": len(all_texts)})
+        documents.append(document)
+
+    removed = sorted(set(previous_docs) - {doc["name"] for doc in documents})
+    if removed:
+        changed = True
+        print(f"🗑️  Dropped {len(removed)} removed document(s): {', '.join(removed)}")
+
+    if not changed:
+        return existing
+    if not all_texts and existing is None:
+        return None
+
+    print(f"📚 Index: {reused} unchanged, {added} new or changed, {len(removed)} removed document(s)")
+    if PDF_DEDUP:
+        print(f"🧹 Near-duplicate chunks collapsed in this run: {collapsed}")
+    blocks = [block for block in row_blocks if len(block)]
+    matrix = np.concatenate(blocks) if blocks else np.zeros((0, 0), dtype=np.float32)
+    signatures = np.concatenate(signature_blocks) if PDF_DEDUP and signature_blocks else None
+    extra_meta = {
+        "model": model_name,
+        "chunker": chunker_settings(),
+        "dedup": dedup_settings(),
+        "collapsed_chunks": sum(doc.get("duplicates", 0) for doc in documents),
+        "documents": documents,
+    }
+    return EmbeddingStore.write(index_directory, all_texts, matrix, extra_meta, metadata=all_metadata, signatures=signatures)
+
+
+def _document_signatures(store: EmbeddingStore, document: Dict[str, Any]) -> np.ndarray:
+    """Stored MinHash signatures of a document's rows, recomputed if the store has none."""
+    if store.signatures is not None:
+        return np.asarray(store.signatures[document["start"]:document["end"]])
+    return minhash_signatures(store.paragraphs[document["start"]:document["end"]])
+
+
+def _existing_signature_index(store: Optional[EmbeddingStore], previous_docs: Dict[str, Dict[str, Any]], kept_names: List[str]) -> NearDuplicateIndex:
+    """LSH index over the rows of the documents that are kept as they are."""
+    blocks, owners = [], []
+    for name in kept_names:
+        document = previous_docs[name]
+        blocks.append(_document_signatures(store, document))
+        owners.extend([name] * (document["end"] - document["start"]))
+    base = np.concatenate(blocks) if blocks else None
+    return NearDuplicateIndex(base, owners)
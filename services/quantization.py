@@ -0,0 +1,133 @@
+import json
+import os
+import time
+from typing import Any, List, Optional, Tuple
+
+import numpy as np
+
+from .embedding_store import save_array, save_json
+from .vector_search import normalize_rows, top_k_indices
+
+QUANT_META_FILE = "int8.json"
+QUANT_CODES_FILE = "embeddings.i8.npy"
+QUANT_SCALES_FILE = "scales.f32.npy"
+
+# Rows dequantized per block while scoring; bounds the float32 scratch memory
+_SCORE_BLOCK = 16384
+
+
+class QuantizedMatrix:
+    """
+    Int8 scalar-quantized embedding matrix with one scale factor per dimension.
+
+    Stores a quarter of the bytes of the float32 matrix. Indexing it with rows
+    returns dequantized float32 vectors, so it can stand in for the float matrix
+    wherever rows are gathered (e.g. the IVF index).
+    """
+
+    def __init__(self, codes: np.ndarray, scales: np.ndarray, meta: Optional[dict] = None):
+        self.codes = codes
+        self.scales = scales
+        self.meta = meta or {}
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return self.codes.shape
+
+    def __getitem__(self, rows) -> np.ndarray:
+        return self.codes[rows].astype(np.float32) * self.scales
+
+    @classmethod
+    def quantize(cls, matrix: np.ndarray) -> "QuantizedMatrix":
+        """Quantize every dimension symmetrically to [-127, 127] using its largest magnitude."""
+        scales = np.zeros(matrix.shape[1], dtype=np.float32)
+        for start in range(0, len(matrix), _SCORE_BLOCK):
+            block = np.abs(np.asarray(matrix[start:start + _SCORE_BLOCK], dtype=np.float32))
+            np.maximum(scales, block.max(axis=0), out=scales)
+        scales = np.where(scales > 0, scales / 127.0, 1.0).astype(np.float32)
+
+        codes = np.empty(matrix.shape, dtype=np.int8)
+        for start in range(0, len(matrix), _SCORE_BLOCK):
+            block = np.asarray(matrix[start:start + _SCORE_BLOCK], dtype=np.float32)
+            codes[start:start + len(block)] = np.clip(np.rint(block / scales), -127, 127)
+        return cls(codes, scales)
+
+    def search(self, query_vectors, top_k: int) -> List[List[Tuple[int, float]]]:
+        """
+        Approximate cosine top-k computed directly on the int8 codes.
+
+        Folding the scales into the query means each block costs one int8->float32
+        conversion and one matrix product, never a dequantized copy of the matrix.
+        """
+        queries = normalize_rows(query_vectors) * self.scales
+        scores = np.empty((len(queries), len(self)), dtype=np.float32)
+        for start in range(0, len(self), _SCORE_BLOCK):
+            block = self.codes[start:start + _SCORE_BLOCK].astype(np.float32)
+            scores[:, start:start + len(block)] = queries @ block.T
+        indices = top_k_indices(scores, top_k)
+        return [[(int(i), float(row_scores[i])) for i in row_indices] for row_scores, row_indices in zip(scores, indices)]
+
+    def save(self, directory: str, extra_meta: Optional[dict] = None) -> None:
+        # Other workers may have the codes mapped, so files are replaced, never rewritten in place;
+        # the metadata goes last so it never describes arrays that are not on disk yet
+        save_array(os.path.join(directory, QUANT_CODES_FILE), self.codes)
+        save_array(os.path.join(directory, QUANT_SCALES_FILE), self.scales)
+        self.meta.update(extra_meta or {})
+        save_json(os.path.join(directory, QUANT_META_FILE), self.meta)
+
+    @classmethod
+    def load(cls, directory: str) -> Optional["QuantizedMatrix"]:
+        meta_path = os.path.join(directory, QUANT_META_FILE)
+        if not os.path.exists(meta_path):
+            return None
+        try:
+            with open(meta_path, "r", encoding="utf-8") as handle:
+                meta = json.load(handle)
+            codes = np.load(os.path.join(directory, QUANT_CODES_FILE), mmap_mode="r")
+            scales = np.load(os.path.join(directory, QUANT_SCALES_FILE))
+            return cls(codes, scales, meta)
+        except (OSError, ValueError) as e:
+            print(f"⚠️  Failed to load int8 embeddings from {directory}: {e}")
+            return None
+
+
+def load_or_quantize(matrix: np.ndarray, directory: str, generation: Any) -> QuantizedMatrix:
+    """Reuse the int8 matrix saved for this store generation, or quantize and save it."""
+    quantized = QuantizedMatrix.load(directory)
+    if quantized is not None and quantized.meta.get("generation") == generation and len(quantized) == len(matrix):
+        return quantized
+
+    started = time.time()
+    quantized = QuantizedMatrix.quantize(matrix)
+    quantized.save(directory, {"generation": generation})
+    print(f"🗜️  Quantized {len(matrix)} embeddings to int8 in {time.time() - started:.1f} seconds")
+    return QuantizedMatrix.load(directory) or quantized
+
+
+def rerank(matrix: np.ndarray, query_vectors, shortlists: List[List[Tuple[int, float]]], top_k: int) -> List[List[Tuple[int, float]]]:
+    """
+    Re-score approximate shortlists against the exact float32 rows and keep the top ``top_k``.
+
+    Args:
+        matrix: Unit-length float32 embedding matrix
+        query_vectors: The queries the shortlists were produced for
+        shortlists: Candidate (row, approximate score) lists, one per query
+        top_k: Number of results to keep per query
+
+    Returns:
+        One list of (row index, exact cosine similarity) pairs per query, best first
+    """
+    queries = normalize_rows(query_vectors)
+    results = []
+    for query, shortlist in zip(queries, shortlists):
+        if not shortlist:
+            results.append([])
+            continue
+        rows = np.sort(np.fromiter((row for row, _ in shortlist), dtype=np.int64))
+        scores = np.asarray(matrix[rows], dtype=np.float32) @ query
+        best = top_k_indices(scores[np.newaxis, :], top_k)[0]
+        results.append([(int(rows[i]), float(scores[i])) for i in best])
+    return results
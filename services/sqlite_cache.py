@@ -0,0 +1,108 @@
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional
+
+
+class SQLiteCache:
+    """
+    Persistent string key/value cache in a local SQLite file, with a time-to-live.
+
+    Shared by every worker process on a host (WAL mode lets readers proceed while
+    one writer commits). Each thread keeps its own connection. Expired rows are
+    purged when the cache is opened and then at most every ``purge_interval``
+    seconds from ``set``, so the file does not grow without bound.
+    """
+
+    def __init__(self, path: str, table: str = "cache", ttl: Optional[float] = None, purge_interval: float = 24 * 3600):
+        self.path = path
+        self.table = table
+        self.ttl = ttl
+        self.purge_interval = purge_interval
+        self._purged_at = 0.0
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        with self._connection() as conn:
+            conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {table} (key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL)"
+            )
+        self._purge_if_due()
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _count(self, attribute: str) -> None:
+        with self._lock:
+            setattr(self, attribute, getattr(self, attribute) + 1)
+
+    def get(self, key: str) -> Optional[str]:
+        try:
+            row = self._connection().execute(
+                f"SELECT value, expires_at FROM {self.table} WHERE key = ?", (key,)
+            ).fetchone()
+        except sqlite3.Error as e:
+            print(f"⚠️  Cache read failed ({self.path}): {e}")
+            self._count("errors")
+            return None
+        if row is None or (row[1] is not None and row[1] <= time.time()):
+            self._count("misses")
+            return None
+        self._count("hits")
+        return row[0]
+
+    def set(self, key: str, value: str) -> None:
+        expires_at = time.time() + self.ttl if self.ttl else None
+        try:
+            with self._connection() as conn:
+                conn.execute(
+                    f"INSERT OR REPLACE INTO {self.table} (key, value, expires_at) VALUES (?, ?, ?)",
+                    (key, value, expires_at),
+                )
+        except sqlite3.Error as e:
+            print(f"⚠️  Cache write failed ({self.path}): {e}")
+            self._count("errors")
+        self._purge_if_due()
+
+    def purge_expired(self) -> int:
+        """Delete expired rows; returns how many were removed."""
+        with self._connection() as conn:
+            return conn.execute(f"DELETE FROM {self.table} WHERE expires_at <= ?", (time.time(),)).rowcount
+
+    def _purge_if_due(self) -> None:
+        if not self.ttl or time.time() - self._purged_at < self.purge_interval:
+            return
+        with self._lock:
+            if time.time() - self._purged_at < self.purge_interval:
+                return
+            self._purged_at = time.time()
+        try:
+            removed = self.purge_expired()
+        except sqlite3.Error as e:
+            print(f"⚠️  Cache purge failed ({self.path}): {e}")
+            self._count("errors")
+            return
+        if removed:
+            print(f"🧹 Purged {removed} expired rows from {self.path}")
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "path": self.path,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "errors": self.errors,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
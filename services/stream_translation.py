@@ -0,0 +1,98 @@
+import os
+import re
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Deque, Generator, Iterable, List, Tuple
+
+from .translation import translate_text
+
+# Shared by all streams in the process; each stream keeps its own results in order
+STREAM_TRANSLATION_WORKERS = int(os.getenv("STREAM_TRANSLATION_WORKERS", "8"))
+# A sentence longer than this is cut at the last whitespace so translation can start
+STREAM_TRANSLATION_MAX_CHARS = int(os.getenv("STREAM_TRANSLATION_MAX_CHARS", "400"))
+
+# Sentence ends followed by whitespace (including the Devanagari danda), or line breaks.
+# A period after a digit is a list number ("1. **Onion**"), not a sentence end.
+SENTENCE_END = re.compile(r"(?<=[.!?।])(?<!\d\.)\s+|\n+")
+
+_EXECUTOR = ThreadPoolExecutor(max_workers=STREAM_TRANSLATION_WORKERS, thread_name_prefix="stream-translate")
+
+
+def split_sentences(buffer: str, max_chars: int = STREAM_TRANSLATION_MAX_CHARS) -> Tuple[List[str], str]:
+    """
+    Split complete sentences off the front of a streaming buffer.
+
+    Returns:
+        The complete sentences (each with its trailing whitespace) and the
+        unfinished remainder that should wait for more text
+    """
+    sentences = []
+    start = 0
+    for match in SENTENCE_END.finditer(buffer):
+        sentences.append(buffer[start:match.end()])
+        start = match.end()
+    rest = buffer[start:]
+    if len(rest) > max_chars:
+        cut = max(rest.rfind(" ", 0, max_chars), 0) or max_chars
+        sentences.append(rest[:cut + 1])
+        rest = rest[cut + 1:]
+    return sentences, rest
+
+
+def _translate_segment(segment: str, translate: Callable[[str], str]) -> str:
+    """Translate the text of a segment, keeping its surrounding whitespace (line breaks, spaces)."""
+    body = segment.strip()
+    if not body:
+        return segment
+    leading = segment[:len(segment) - len(segment.lstrip())]
+    trailing = segment[len(segment.rstrip()):]
+    return f"{leading}{translate(body)}{trailing}"
+
+
+def translate_stream(
+    chunks: Iterable[str],
+    src_language: str = "en",
+    dest_language: str = "en",
+    translate: Callable[[str, str, str], str] = translate_text,
+) -> Generator[str, None, None]:
+    """
+    Translate a stream of text chunks sentence by sentence, in order.
+
+    Chunks are buffered up to sentence boundaries so each translation request
+    sees whole sentences. Each sentence is submitted to the worker pool as soon
+    as it is complete, while the source keeps streaming, and translations are
+    yielded in source order as soon as they, and everything before them, are done.
+
+    Args:
+        chunks: Source text chunks (e.g. a Gemini stream)
+        src_language: Language of the chunks
+        dest_language: Language to translate into
+        translate: Translation function taking (text, src_language, dest_language)
+
+    Returns:
+        Generator of translated segments
+    """
+    if src_language == dest_language:
+        yield from chunks
+        return
+
+    def translate_one(text: str) -> str:
+        return translate(text, src_language, dest_language)
+
+    pending: Deque[Future] = deque()
+    buffer = ""
+    try:
+        for chunk in chunks:
+            buffer += chunk
+            sentences, buffer = split_sentences(buffer)
+            for sentence in sentences:
+                pending.append(_EXECUTOR.submit(_translate_segment, sentence, translate_one))
+            while pending and pending[0].done():
+                yield pending.popleft().result()
+        if buffer:
+            pending.append(_EXECUTOR.submit(_translate_segment, buffer, translate_one))
+        while pending:
+            yield pending.popleft().result()
+    finally:
+        for future in pending:
+            future.cancel()
@@ -1,14 +1,194 @@
+import hashlib
+import os
+import re
+import threading
+from typing import Any, Dict, List, Optional
+
 from deep_translator import GoogleTranslator
 
+from .cache import TTLCache
+from .sqlite_cache import SQLiteCache
+
+# Override for the page GoogleTranslator scrapes (e.g. the soak test stand-in)
+GOOGLE_TRANSLATE_URL = os.getenv("GOOGLE_TRANSLATE_URL")
+
+# Two-tier cache: per-process LRU in front of a SQLite file shared by the workers on a host.
+# Set TRANSLATION_CACHE_PATH to an empty string to keep translations in memory only.
+TRANSLATION_CACHE_SIZE = int(os.getenv("TRANSLATION_CACHE_SIZE", "4096"))
+TRANSLATION_CACHE_TTL = float(os.getenv("TRANSLATION_CACHE_TTL", str(30 * 24 * 3600)))
+TRANSLATION_CACHE_PATH = os.getenv(
+    "TRANSLATION_CACHE_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".translation_cache.sqlite3"),
+)
+
+# GoogleTranslator rejects texts over 5000 characters
+TRANSLATION_BATCH_CHARS = 4500
+
+# A run of words: starts and ends with a letter; inner spaces, apostrophes, hyphens,
+# slashes, ampersands and periods only when a letter follows. Digits end a run.
+TRANSLATABLE_SEGMENT = re.compile(r"[^\W\d_](?:[^\W\d_]|[ '’&/.-](?=[^\W\d_]))*")
+
+_MEMORY_CACHE = TTLCache(maxsize=TRANSLATION_CACHE_SIZE, ttl=TRANSLATION_CACHE_TTL)
+_STORE: Optional[SQLiteCache] = None
+_STATS = {"lookups": 0, "cache_hits": 0, "network_calls": 0, "failures": 0}
+# Streamed replies translate on a thread pool, so the counters are updated concurrently
+_STATS_LOCK = threading.Lock()
+
+if TRANSLATION_CACHE_PATH:
+    try:
+        _STORE = SQLiteCache(TRANSLATION_CACHE_PATH, table="translations", ttl=TRANSLATION_CACHE_TTL)
+    except Exception as e:
+        print(f"⚠️  Translation cache file unavailable ({e}), caching in memory only")
+
+
+def _count(name: str) -> None:
+    with _STATS_LOCK:
+        _STATS[name] += 1
+
+
+def normalize_text(text: str) -> str:
+    """Cache key text: trimmed, with runs of spaces/tabs collapsed (line breaks are kept)."""
+    return re.sub(r"[ \t]+", " ", text.strip())
+
+
+def _cache_key(text: str, src_language: str, dest_language: str) -> str:
+    digest = hashlib.sha256(normalize_text(text).encode("utf-8")).hexdigest()
+    return f"{src_language}:{dest_language}:{digest}"
+
+
+def _cached(key: str) -> Optional[str]:
+    cached = _MEMORY_CACHE.get(key)
+    if cached is None and _STORE is not None:
+        cached = _STORE.get(key)
+        if cached is not None:
+            _MEMORY_CACHE.set(key, cached)
+    return cached
+
+
+def _remember(key: str, translated: str) -> None:
+    _MEMORY_CACHE.set(key, translated)
+    if _STORE is not None:
+        _STORE.set(key, translated)
+
+
+def _google_translate(text: str, src_language: str, dest_language: str) -> str:
+    source_lang = None if src_language == "auto" else src_language
+    translator = GoogleTranslator(source=source_lang, target=dest_language)
+    if GOOGLE_TRANSLATE_URL:
+        translator._base_url = GOOGLE_TRANSLATE_URL
+    return translator.translate(text)
+
 
 def translate_text(text: str, src_language: str = "auto", dest_language: str = "en") -> str:
     if not text:
         return ""
     if src_language == dest_language:
         return text
-    source_lang = None if src_language == "auto" else src_language
+
+    key = _cache_key(text, src_language, dest_language)
+    _count("lookups")
+    cached = _cached(key)
+    if cached is not None:
+        _count("cache_hits")
+        return cached
+
     try:
-        translator = GoogleTranslator(source=source_lang, target=dest_language)
-        return translator.translate(text)
+        _count("network_calls")
+        translated = _google_translate(text, src_language, dest_language)
     except Exception:
+        _count("failures")
         return text
+
+    if translated:
+        # Failures fall back to the source text above and are never cached
+        _remember(key, translated)
+    return translated
+
+
+def translate_batch(texts: List[str], src_language: str = "auto", dest_language: str = "en") -> List[str]:
+    """
+    Translate many short single-line texts with as few requests as possible.
+
+    Texts are de-duplicated and looked up in the cache first; the remaining ones
+    are joined one per line into requests of up to TRANSLATION_BATCH_CHARS
+    characters. If a response does not split back into the same number of lines,
+    that batch falls back to one request per text.
+
+    Args:
+        texts: Texts to translate (line breaks inside a text are not supported)
+        src_language: Source language code, or "auto"
+        dest_language: Target language code
+
+    Returns:
+        Translations in input order (the source text where translation failed)
+    """
+    if src_language == dest_language:
+        return list(texts)
+
+    keys = [_cache_key(text, src_language, dest_language) for text in texts]
+    translations: Dict[str, str] = {}  # cache key -> translation
+    missing: Dict[str, str] = {}  # cache key -> text
+    for key, text in zip(keys, texts):
+        if not text.strip() or key in translations or key in missing:
+            continue
+        _count("lookups")
+        cached = _cached(key)
+        if cached is not None:
+            _count("cache_hits")
+            translations[key] = cached
+        else:
+            missing[key] = text
+
+    batches: List[List[tuple]] = [[]]
+    size = 0
+    for key, text in missing.items():
+        if batches[-1] and size + len(text) + 1 > TRANSLATION_BATCH_CHARS:
+            batches.append([])
+            size = 0
+        batches[-1].append((key, text))
+        size += len(text) + 1
+
+    for batch in batches:
+        if not batch:
+            continue
+        try:
+            _count("network_calls")
+            lines = _google_translate("\n".join(normalize_text(text) for _, text in batch), src_language, dest_language).split("\n")
+        except Exception:
+            _count("failures")
+            lines = []
+        if len(lines) != len(batch):
+            lines = [translate_text(text, src_language, dest_language) for _, text in batch]
+        for (key, text), translated in zip(batch, lines):
+            translations[key] = translated.strip() or text
+            if translations[key] != text:
+                _remember(key, translations[key])
+
+    return [translations.get(key, text) for key, text in zip(keys, texts)]
+
+
+def translate_structured(text: str, src_language: str = "auto", dest_language: str = "en") -> str:
+    """
+    Translate a formatted reply (e.g. market prices) segment by segment.
+
+    Only runs of words are translated, in one de-duplicated batch; numbers, ₹
+    prices, emoji, list markers, Markdown and line layout are left untouched and
+    the reply is reassembled locally.
+    """
+    if not text or src_language == dest_language:
+        return text
+    segments = [match.group() for match in TRANSLATABLE_SEGMENT.finditer(text)]
+    translated = dict(zip(segments, translate_batch(segments, src_language, dest_language)))
+    return TRANSLATABLE_SEGMENT.sub(lambda match: translated.get(match.group(), match.group()), text)
+
+
+def get_translation_cache_stats() -> Dict[str, Any]:
+    with _STATS_LOCK:
+        stats = dict(_STATS)
+    lookups = stats["lookups"]
+    return {
+        **stats,
+        "hit_rate": round(stats["cache_hits"] / lookups, 4) if lookups else 0.0,
+        "memory": _MEMORY_CACHE.stats(),
+        "persistent": _STORE.stats() if _STORE is not None else None,
+    }
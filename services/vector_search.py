@@ -0,0 +1,58 @@
+from typing import List, Tuple
+
+import numpy as np
+
+
+def normalize_rows(vectors) -> np.ndarray:
+    """Return a float32 copy of ``vectors`` with every row scaled to unit length."""
+    matrix = np.asarray(vectors, dtype=np.float32)
+    if matrix.ndim == 1:
+        matrix = matrix.reshape(1, -1)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def top_k_indices(scores: np.ndarray, top_k: int) -> np.ndarray:
+    """
+    Pick the ``top_k`` highest scores of every row without sorting the full row.
+
+    Args:
+        scores: 2-D array of similarity scores (queries x candidates)
+        top_k: Number of results to keep per query
+
+    Returns:
+        Array of candidate indices (queries x top_k), best first
+    """
+    count = scores.shape[1]
+    top_k = min(top_k, count)
+    if top_k <= 0:
+        return np.empty((scores.shape[0], 0), dtype=np.int64)
+    if top_k < count:
+        partition = np.argpartition(-scores, top_k - 1, axis=1)[:, :top_k]
+    else:
+        partition = np.tile(np.arange(count), (scores.shape[0], 1))
+    partition_scores = np.take_along_axis(scores, partition, axis=1)
+    order = np.argsort(-partition_scores, axis=1, kind="stable")
+    return np.take_along_axis(partition, order, axis=1)
+
+
+def exact_search(matrix: np.ndarray, query_vectors, top_k: int) -> List[List[Tuple[int, float]]]:
+    """
+    Score normalized queries against a pre-normalized matrix with one matrix product.
+
+    Args:
+        matrix: Unit-length float32 embedding matrix (rows x dim)
+        query_vectors: A single query vector or a batch of them
+        top_k: Number of results to return per query
+
+    Returns:
+        One list of (row index, cosine similarity) pairs per query, best first
+    """
+    queries = normalize_rows(query_vectors)
+    scores = queries @ matrix.T
+    indices = top_k_indices(scores, top_k)
+    results = []
+    for row_scores, row_indices in zip(scores, indices):
+        results.append([(int(i), float(row_scores[i])) for i in row_indices])
+    return results
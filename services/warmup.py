@@ -0,0 +1,93 @@
+import multiprocessing
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+from .gemini import init_gemini, is_gemini_initialized
+from .market import MARKET_SNAPSHOT_ENABLED, is_market_snapshot_ready, warm_market_snapshot
+from .pdf_context import is_retrieval_ready, warm_retrieval
+
+# Set AGRI_WARMUP=0 to skip the background warm-up and initialize everything on first use
+WARMUP_ENABLED = os.getenv("AGRI_WARMUP", "1") != "0"
+
+# name -> (warm-up callable, probe telling whether the subsystem is already warm)
+_SUBSYSTEMS: Dict[str, Dict[str, Callable[[], Any]]] = {}
+_STATE: Dict[str, Dict[str, Any]] = {}
+_STATE_LOCK = threading.Lock()
+_WARMUP_THREAD: Optional[threading.Thread] = None
+
+
+def register_subsystem(name: str, warm: Callable[[], Any], probe: Callable[[], bool]) -> None:
+    """Register a heavy subsystem to be initialized by the background warm-up."""
+    _SUBSYSTEMS[name] = {"warm": warm, "probe": probe}
+    with _STATE_LOCK:
+        _STATE.setdefault(name, {"state": "cold"})
+
+
+def _set_state(name: str, **fields: Any) -> None:
+    with _STATE_LOCK:
+        _STATE[name] = {**_STATE.get(name, {}), **fields}
+
+
+def warm_subsystem(name: str) -> None:
+    """Initialize one subsystem and record how long it took."""
+    started = time.time()
+    _set_state(name, state="warming", error=None)
+    try:
+        result = _SUBSYSTEMS[name]["warm"]()
+    except Exception as e:
+        print(f"⚠️  Warm-up of {name} failed: {e}")
+        _set_state(name, state="failed", error=str(e), seconds=round(time.time() - started, 3))
+        return
+    _set_state(name, state="ready", seconds=round(time.time() - started, 3))
+    if isinstance(result, bool):
+        # e.g. Gemini warms fine without an API key but is not usable
+        _set_state(name, available=result)
+    print(f"🔥 {name} warm in {time.time() - started:.2f} seconds")
+
+
+def _warm_all() -> None:
+    for name in list(_SUBSYSTEMS):
+        warm_subsystem(name)
+
+
+def start_background_warmup() -> Optional[threading.Thread]:
+    """Warm every registered subsystem on a daemon thread (once per process)."""
+    global _WARMUP_THREAD
+    # Spawned helper processes (PDF extraction) re-import the main module; never warm up there
+    if not WARMUP_ENABLED or multiprocessing.parent_process() is not None:
+        return None
+    if _WARMUP_THREAD is None:
+        _WARMUP_THREAD = threading.Thread(target=_warm_all, name="agri-warmup", daemon=True)
+        _WARMUP_THREAD.start()
+    return _WARMUP_THREAD
+
+
+def get_readiness() -> Dict[str, Any]:
+    """
+    Report the warm state of every registered subsystem.
+
+    Returns:
+        Dictionary with an overall 'ready' flag and per-subsystem state
+        ('cold', 'warming', 'ready' or 'failed')
+    """
+    subsystems: Dict[str, Dict[str, Any]] = {}
+    for name, hooks in _SUBSYSTEMS.items():
+        with _STATE_LOCK:
+            state = dict(_STATE.get(name, {"state": "cold"}))
+        # A request may have warmed the subsystem on demand before the warm-up thread got to it
+        if state["state"] in ("cold", "warming") and hooks["probe"]():
+            state["state"] = "ready"
+        subsystems[name] = state
+
+    return {
+        "ready": all(state["state"] == "ready" for state in subsystems.values()),
+        "subsystems": subsystems,
+    }
+
+
+register_subsystem("pdf_index", warm_retrieval, is_retrieval_ready)
+register_subsystem("gemini", init_gemini, is_gemini_initialized)
+if MARKET_SNAPSHOT_ENABLED:
+    register_subsystem("market_snapshot", warm_market_snapshot, is_market_snapshot_ready)
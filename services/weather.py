@@ -2,12 +2,15 @@ import os
 
 import requests
 
+from .i18n import localize_name, localize_place, t
+
 OPENWEATHER_API_KEY = os.getenv("OPENWEATHER_API_KEY", "YOUR_OPENWEATHER_API_KEY")
+OPENWEATHER_API_URL = os.getenv("OPENWEATHER_API_URL", "https://api.openweathermap.org/data/2.5/weather")
 
 
-def get_weather(location: str) -> str:
+def get_weather(location: str, language: str = "en") -> str:
     if not location:
-        return "I do not know your location yet. Please update it first."
+        return t("weather_no_location", language)
 
     params = {
         "q": location,
@@ -15,13 +18,14 @@ def get_weather(location: str) -> str:
         "units": "metric",
     }
     try:
-        response = requests.get("https://api.openweathermap.org/data/2.5/weather", params=params, timeout=8)
+        response = requests.get(OPENWEATHER_API_URL, params=params, timeout=8)
         response.raise_for_status()
         data = response.json()
         temp = data.get("main", {}).get("temp")
         description = data.get("weather", [{}])[0].get("description", "weather conditions")
+        place = localize_place(location, language)
         if temp is not None:
-            return f"The weather in {location} is {temp}°C with {description}."
-        return f"I could not retrieve detailed weather data for {location}."
+            return t("weather_report", language, location=place, temp=temp, description=localize_name(description, language))
+        return t("weather_no_details", language, location=place)
     except requests.RequestException:
-        return f"Weather data for {location} is currently unavailable. Please try again later."
+        return t("weather_unavailable", language, location=localize_place(location, language))
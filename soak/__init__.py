@@ -0,0 +1,10 @@
+"""
+Local stand-ins for the external services and a load generator for soak tests.
+
+    python -m soak.stubs --port 8765          # market, weather and translate stand-ins
+    GEMINI_BACKEND=stub MARKET_API_URL=... python app.py
+    python -m soak.loadgen --base-url http://127.0.0.1:5000 --email ... --password ...
+
+See ``soak.stubs`` for the environment variables that shape stand-in latency,
+error rate and streaming cadence.
+"""
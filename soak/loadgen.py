@@ -0,0 +1,198 @@
+"""
+Replay a chat/market/weather traffic mix against a running app and report latency.
+
+    python -m soak.loadgen --base-url http://127.0.0.1:5000 --email soak@example.com \\
+        --password soak --signup --users 8 --duration 60 --mix chat=6,market=3,weather=1
+
+Each virtual user logs in with its own session and sends messages back to back,
+split between ``/chat_stream`` and ``/get_response`` by ``--stream-share``.
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+import numpy as np
+import requests
+
+MESSAGES = {
+    "chat": [
+        "How do I control stem borer in paddy?",
+        "What is the right time to sow wheat in Punjab?",
+        "How much water does sugarcane need in summer?",
+        "Which organic fertilizer is good for tomato?",
+        "How can I improve soil fertility naturally?",
+        "What are the benefits of drip irrigation?",
+        "How do I prepare jeevamrutha for natural farming?",
+        "Which government schemes support organic farming?",
+        "How do I protect cotton from pink bollworm?",
+        "What is the spacing for planting banana?",
+    ],
+    "market": [
+        "What are the market prices today?",
+        "Show me the onion price",
+        "What is the price of wheat in my mandi?",
+        "Current market rates for tomato",
+    ],
+    "weather": [
+        "What is the weather today?",
+        "Will the weather be good for spraying?",
+        "Tell me the weather in my area",
+    ],
+}
+
+
+def _parse_mix(text: str) -> Dict[str, float]:
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        if name.strip() not in MESSAGES:
+            raise argparse.ArgumentTypeError(f"unknown scenario {name!r}; choose from {', '.join(MESSAGES)}")
+        mix[name.strip()] = float(weight or 1)
+    return mix
+
+
+class Recorder:
+    """Thread-safe latency samples keyed by (endpoint, scenario)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencies: Dict[tuple, List[float]] = defaultdict(list)
+        self.first_chunk: Dict[tuple, List[float]] = defaultdict(list)
+        self.errors: Dict[tuple, int] = defaultdict(int)
+
+    def record(self, key: tuple, latency: float, first_chunk: Optional[float] = None, error: bool = False) -> None:
+        with self._lock:
+            if error:
+                self.errors[key] += 1
+                return
+            self.latencies[key].append(latency)
+            if first_chunk is not None:
+                self.first_chunk[key].append(first_chunk)
+
+    def report(self, elapsed: float) -> str:
+        def percentiles(samples: List[float]) -> str:
+            if not samples:
+                return f"{'-':>8} {'-':>8} {'-':>8}"
+            p50, p90, p99 = np.percentile(np.asarray(samples) * 1000, [50, 90, 99])
+            return f"{p50:>8.0f} {p90:>8.0f} {p99:>8.0f}"
+
+        lines = [f"{'endpoint':<14} {'scenario':<8} {'ok':>6} {'err':>5} {'req/s':>7}  {'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8}  first chunk p50/p90/p99"]
+        keys = sorted(set(self.latencies) | set(self.errors))
+        for key in keys:
+            ok = len(self.latencies[key])
+            lines.append(
+                f"{key[0]:<14} {key[1]:<8} {ok:>6} {self.errors[key]:>5} {ok / elapsed:>7.2f}  "
+                f"{percentiles(self.latencies[key])}  {percentiles(self.first_chunk[key]) if key in self.first_chunk else ''}"
+            )
+        total_ok = sum(len(samples) for samples in self.latencies.values())
+        total_errors = sum(self.errors.values())
+        everything = [latency for samples in self.latencies.values() for latency in samples]
+        lines.append(
+            f"{'total':<14} {'':<8} {total_ok:>6} {total_errors:>5} {total_ok / elapsed:>7.2f}  {percentiles(everything)}"
+        )
+        return "\n".join(lines)
+
+
+def _login(base_url: str, email: str, password: str, signup: bool, timeout: float) -> requests.Session:
+    session = requests.Session()
+    if signup:
+        session.post(f"{base_url}/signup", data={
+            "name": "Soak Test",
+            "email": email,
+            "state": "Maharashtra",
+            "district": "Pune",
+            "preferred_language": "en",
+            "password": password,
+        }, timeout=timeout)
+    response = session.post(f"{base_url}/login", data={"email": email, "password": password}, timeout=timeout, allow_redirects=False)
+    if response.status_code != 302 or "login" in response.headers.get("Location", ""):
+        raise SystemExit(f"Login failed for {email} (HTTP {response.status_code}); pass --signup to create the account")
+    return session
+
+
+def _send_stream(session: requests.Session, base_url: str, message: str, timeout: float):
+    """POST to /chat_stream and read the SSE body; returns (first chunk seconds, total seconds)."""
+    started = time.perf_counter()
+    first_chunk = None
+    with session.post(f"{base_url}/chat_stream", json={"message": message}, stream=True, timeout=timeout) as response:
+        response.raise_for_status()
+        for line in response.iter_lines(decode_unicode=True):
+            if not line or not line.startswith("data: "):
+                continue
+            event = json.loads(line[len("data: "):])
+            if "text" in event and first_chunk is None:
+                first_chunk = time.perf_counter() - started
+            if event.get("done") or "error" in event:
+                break
+    return first_chunk, time.perf_counter() - started
+
+
+def _send_blocking(session: requests.Session, base_url: str, message: str, timeout: float) -> float:
+    started = time.perf_counter()
+    response = session.post(f"{base_url}/get_response", json={"message": message}, timeout=timeout)
+    response.raise_for_status()
+    return time.perf_counter() - started
+
+
+def _virtual_user(args, email: str, deadline: float, recorder: Recorder, seed: int) -> None:
+    rng = random.Random(seed)
+    session = _login(args.base_url, email, args.password, args.signup, args.timeout)
+    scenarios, weights = zip(*args.mix.items())
+    sent = 0
+    while time.monotonic() < deadline and (not args.requests or sent < args.requests):
+        scenario = rng.choices(scenarios, weights)[0]
+        message = rng.choice(MESSAGES[scenario])
+        stream = rng.random() < args.stream_share
+        key = ("/chat_stream" if stream else "/get_response", scenario)
+        try:
+            if stream:
+                first_chunk, latency = _send_stream(session, args.base_url, message, args.timeout)
+                recorder.record(key, latency, first_chunk)
+            else:
+                recorder.record(key, _send_blocking(session, args.base_url, message, args.timeout))
+        except (requests.RequestException, ValueError):
+            recorder.record(key, 0.0, error=True)
+        sent += 1
+        if args.think_ms:
+            time.sleep(rng.expovariate(1000 / args.think_ms))
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Replay a chat/market/weather mix against the app.")
+    parser.add_argument("--base-url", default="http://127.0.0.1:5000")
+    parser.add_argument("--email", required=True, help="login email; with --users > 1, '+N' is added per user")
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--signup", action="store_true", help="create the accounts before logging in")
+    parser.add_argument("--users", type=int, default=4, help="concurrent virtual users")
+    parser.add_argument("--duration", type=float, default=60.0, help="seconds to run")
+    parser.add_argument("--requests", type=int, default=0, help="stop each user after this many requests (0 = no limit)")
+    parser.add_argument("--mix", type=_parse_mix, default=_parse_mix("chat=6,market=3,weather=1"))
+    parser.add_argument("--stream-share", type=float, default=0.7, help="fraction of requests sent to /chat_stream")
+    parser.add_argument("--think-ms", type=float, default=0.0, help="mean pause between a user's requests")
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    recorder = Recorder()
+    local, _, domain = args.email.partition("@")
+    emails = [args.email] if args.users == 1 else [f"{local}+{n}@{domain}" for n in range(args.users)]
+    started = time.monotonic()
+    deadline = started + args.duration
+    threads = [
+        threading.Thread(target=_virtual_user, args=(args, email, deadline, recorder, args.seed + n), daemon=True)
+        for n, email in enumerate(emails)
+    ]
+    print(f"🚜 {args.users} users against {args.base_url} for up to {args.duration:.0f}s, mix {args.mix}")
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    print(recorder.report(time.monotonic() - started))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,242 @@
+"""
+Stand-ins for Gemini, data.gov.in, OpenWeather and Google Translate.
+
+Gemini is replaced in-process (``GEMINI_BACKEND=stub``); the three HTTP APIs are
+served from one localhost server started with ``python -m soak.stubs``, which
+prints the environment variables that point the app at it.
+
+Behaviour is shaped per stand-in with ``SOAK_<NAME>_<SETTING>`` variables, falling
+back to ``SOAK_<SETTING>`` (NAME is GEMINI, MARKET, WEATHER or TRANSLATE):
+
+    LATENCY_MS         mean delay before the response (or first chunk)
+    JITTER_MS          uniform +/- jitter around the mean
+    ERROR_RATE         fraction of requests that fail (HTTP 503 / raised error)
+    CHUNK_INTERVAL_MS  delay between streamed chunks (Gemini only)
+    CHUNKS             number of streamed chunks (Gemini only)
+"""
+import argparse
+import html
+import json
+import os
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Iterator, List, Optional
+from urllib.parse import parse_qs, urlparse
+
+_DEFAULTS = {
+    "LATENCY_MS": 300.0,
+    "JITTER_MS": 100.0,
+    "ERROR_RATE": 0.0,
+    "CHUNK_INTERVAL_MS": 60.0,
+    "CHUNKS": 12,
+}
+
+STATES = {
+    "Maharashtra": ["Pune", "Nagpur", "Nashik", "Mumbai"],
+    "Karnataka": ["Bangalore", "Mysore", "Belgaum"],
+    "Uttar Pradesh": ["Lucknow", "Kanpur", "Agra"],
+    "Tamil Nadu": ["Chennai", "Coimbatore", "Madurai"],
+    "Punjab": ["Ludhiana", "Amritsar", "Patiala"],
+}
+COMMODITIES = {
+    "Onion": 2200, "Tomato": 1800, "Potato": 1500, "Wheat": 2400, "Rice": 3100,
+    "Cotton": 6800, "Soyabean": 4600, "Maize": 2000, "Banana": 2500, "Green Chilli": 3800,
+}
+
+
+class StandInConfig:
+    """Latency, error and streaming settings of one stand-in."""
+
+    def __init__(self, name: str):
+        self.name = name.upper()
+        self.latency_ms = self._setting("LATENCY_MS")
+        self.jitter_ms = self._setting("JITTER_MS")
+        self.error_rate = self._setting("ERROR_RATE")
+        self.chunk_interval_ms = self._setting("CHUNK_INTERVAL_MS")
+        self.chunks = int(self._setting("CHUNKS"))
+
+    def _setting(self, key: str) -> float:
+        value = os.getenv(f"SOAK_{self.name}_{key}", os.getenv(f"SOAK_{key}"))
+        return float(value) if value is not None else float(_DEFAULTS[key])
+
+    def delay(self) -> None:
+        jitter = random.uniform(-self.jitter_ms, self.jitter_ms)
+        time.sleep(max(self.latency_ms + jitter, 0.0) / 1000)
+
+    def should_fail(self) -> bool:
+        return random.random() < self.error_rate
+
+
+class _StubChunk:
+    def __init__(self, text: str):
+        self.text = text
+
+
+class StubGenerativeModel:
+    """Drop-in for ``genai.GenerativeModel`` that answers from the prompt without a network call."""
+
+    def __init__(self, model_name: str, config: Optional[StandInConfig] = None):
+        self.model_name = model_name
+        self.config = config or StandInConfig("gemini")
+
+    def _answer(self, prompt: str) -> List[str]:
+        question = prompt.split("User Question:", 1)[-1].split("\n", 1)[0].strip() or "your question"
+        words = (
+            f"Here is what I recommend for {question} Check soil moisture before irrigating, "
+            "use certified seed, follow the recommended fertilizer dose for your district and "
+            "scout the field weekly for pests so treatment can start early."
+        ).split()
+        per_chunk = max(len(words) // max(self.config.chunks, 1), 1)
+        return [" ".join(words[i:i + per_chunk]) + " " for i in range(0, len(words), per_chunk)]
+
+    def _stream(self, chunks: List[str]) -> Iterator[_StubChunk]:
+        self.config.delay()
+        for position, text in enumerate(chunks):
+            if position:
+                time.sleep(self.config.chunk_interval_ms / 1000)
+            yield _StubChunk(text)
+
+    def generate_content(self, prompt: str, stream: bool = False, generation_config: Optional[Dict[str, Any]] = None):
+        if self.config.should_fail():
+            raise RuntimeError(f"stub {self.model_name}: injected failure")
+        chunks = self._answer(prompt)
+        if stream:
+            return self._stream(chunks)
+        self.config.delay()
+        return _StubChunk("".join(chunks).strip())
+
+
+def _market_records(total: int) -> List[Dict[str, str]]:
+    """Deterministic data.gov.in-style price records."""
+    rng = random.Random(7)
+    records = []
+    while len(records) < total:
+        for state, districts in STATES.items():
+            for district in districts:
+                for commodity, base in COMMODITIES.items():
+                    modal = int(base * rng.uniform(0.8, 1.25))
+                    records.append({
+                        "state": state,
+                        "district": district,
+                        "market": f"{district} APMC",
+                        "commodity": commodity,
+                        "variety": "Other",
+                        "arrival_date": time.strftime("%d/%m/%Y"),
+                        "min_price": str(int(modal * 0.85)),
+                        "max_price": str(int(modal * 1.15)),
+                        "modal_price": str(modal),
+                    })
+    return records[:total]
+
+
+class _StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+    def _send(self, status: int, body: str, content_type: str = "application/json") -> None:
+        payload = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", f"{content_type}; charset=utf-8")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self) -> None:
+        url = urlparse(self.path)
+        params = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        routes = {"/market": self._market, "/weather": self._weather, "/translate": self._translate}
+        route = routes.get(url.path.rstrip("/"))
+        if route is None:
+            self._send(404, json.dumps({"error": "not found"}))
+            return
+        config = self.server.configs[url.path.strip("/")]
+        config.delay()
+        if config.should_fail():
+            self._send(503, json.dumps({"error": "injected failure"}))
+            return
+        route(params)
+
+    def _market(self, params: Dict[str, str]) -> None:
+        records = self.server.market_records
+        offset = int(params.get("offset", 0))
+        limit = int(params.get("limit", 10))
+        self._send(200, json.dumps({
+            "title": "Current Daily Price of Various Commodities from Various Markets (Mandi)",
+            "desc": "Stand-in market data",
+            "updated_date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "total": len(records),
+            "count": len(records[offset:offset + limit]),
+            "offset": offset,
+            "limit": limit,
+            "records": records[offset:offset + limit],
+        }))
+
+    def _weather(self, params: Dict[str, str]) -> None:
+        rng = random.Random(params.get("q", ""))
+        self._send(200, json.dumps({
+            "name": params.get("q", ""),
+            "main": {"temp": round(rng.uniform(18, 38), 1), "humidity": rng.randint(30, 90)},
+            "weather": [{"description": rng.choice(["clear sky", "few clouds", "light rain", "haze"])}],
+        }))
+
+    def _translate(self, params: Dict[str, str]) -> None:
+        # Same markup deep_translator's GoogleTranslator scrapes from the mobile page
+        text = "\n".join(f"[{params.get('tl', '')}] {line}" for line in params.get("q", "").split("\n"))
+        self._send(200, f'<html><body><div class="t0">{html.escape(text)}</div></body></html>', "text/html")
+
+
+class StandInServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, market_records: int = 5000):
+        super().__init__(address, _StandInHandler)
+        self.configs = {name: StandInConfig(name) for name in ("market", "weather", "translate")}
+        self.market_records = _market_records(market_records)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def environment(self) -> Dict[str, str]:
+        """Environment variables that point the app at this server."""
+        return {
+            "MARKET_API_URL": f"{self.base_url}/market",
+            "OPENWEATHER_API_URL": f"{self.base_url}/weather",
+            "GOOGLE_TRANSLATE_URL": f"{self.base_url}/translate",
+            "GEMINI_BACKEND": "stub",
+        }
+
+
+def start_stand_ins(host: str = "127.0.0.1", port: int = 0, market_records: int = 5000) -> StandInServer:
+    """Serve the HTTP stand-ins from a daemon thread (port 0 picks a free port)."""
+    server = StandInServer((host, port), market_records=market_records)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Serve local stand-ins for the market, weather and translate APIs.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--market-records", type=int, default=5000)
+    args = parser.parse_args(argv)
+
+    server = StandInServer((args.host, args.port), market_records=args.market_records)
+    print(f"🧪 Stand-ins listening on {server.base_url}; start the app with:")
+    for key, value in server.environment().items():
+        print(f"   export {key}={value}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()